@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+from starlette.responses import JSONResponse
+from app.infrastructure.services.get_user_service import auth_cache
+from app.infrastructure.services.model_registry import model_registry
+from app.infrastructure.services.report_service import report_service
+
+router = APIRouter(prefix="/health", tags=["HEALTH"])
+
+
+@router.get("/live")
+async def liveness():
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    if model_registry.ready:
+        return {
+            "status": "ready",
+            "model_version": model_registry.predictor.version,
+            "loading": model_registry.loading
+        }
+
+    status = "error" if model_registry.error else "loading"
+    return JSONResponse(status_code=503, content={"status": status, "detail": model_registry.error})
+
+
+@router.get("/metrics")
+async def metrics():
+    # Tamaño y tasa de aciertos de las cachés en memoria de este proceso
+    return {
+        "auth_cache": auth_cache.stats(),
+        "result_cache": model_registry.result_cache_stats,
+        "report_cache": report_service.stats()
+    }
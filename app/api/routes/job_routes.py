@@ -0,0 +1,74 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Path, Query
+from app.core.config import settings
+from app.domain.interfaces.job_queue_interface import JobQueueInterface
+from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.domain.models.recognition_job_model import JobSubmitted, RecognitionJob
+from app.infrastructure.services.get_user_service import get_current_user
+from app.infrastructure.services.job_queue import get_job_queue
+from app.infrastructure.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/ocr/jobs", tags=["OCR"])
+
+
+async def _get_user_job(job_id: str, user: dict, queue: JobQueueInterface) -> RecognitionJob:
+    job = await queue.get(job_id, str(user["_id"]))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("", response_model=JobSubmitted, status_code=202)
+async def submit_job(
+    image: UploadFile = File(...),
+    layout: Optional[str] = Query(None, description="Display layout; detected from the display aspect ratio when omitted"),
+    user = Depends(get_current_user),
+    queue: JobQueueInterface = Depends(get_job_queue)
+):
+    if not image.content_type or not image.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File uploaded is not an image")
+    if layout and model_registry.layouts is not None and layout not in model_registry.layouts:
+        raise HTTPException(status_code=400, detail=f"Unknown display layout '{layout}'")
+
+    image_bytes = await image.read()
+    if len(image_bytes) > settings.BATCH_MAX_IMAGE_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail="Image exceeds the maximum size per image")
+
+    try:
+        job = await queue.submit(str(user["_id"]), image.filename, image_bytes, layout)
+    except Exception as e:
+        logger.error(f"Failed to queue recognition job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error queuing job")
+
+    logger.info(f"Queued recognition job {job.job_id} for {image.filename}")
+    return JobSubmitted(job_id=job.job_id, status=job.status)
+
+
+@router.get("/{job_id}", response_model=RecognitionJob)
+async def get_job_status(
+    job_id: str = Path(...),
+    user = Depends(get_current_user),
+    queue: JobQueueInterface = Depends(get_job_queue)
+):
+    return await _get_user_job(job_id, user, queue)
+
+
+@router.get("/{job_id}/result", response_model=DisplayRecognitionResult)
+async def get_job_result(
+    job_id: str = Path(...),
+    user = Depends(get_current_user),
+    queue: JobQueueInterface = Depends(get_job_queue)
+):
+    job = await _get_user_job(job_id, user, queue)
+    if job.status == "failed":
+        raise HTTPException(status_code=422, detail=job.error or "Job failed")
+    if job.status != "done":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is {job.status}",
+            headers={"Retry-After": str(max(1, round(settings.JOB_POLL_INTERVAL_SECONDS)))}
+        )
+    return job.result
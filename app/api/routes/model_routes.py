@@ -0,0 +1,35 @@
+import logging, secrets
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.core.config import settings
+from app.domain.models.model_version_model import ModelLoadRequest, ModelVersionInfo
+from app.infrastructure.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/models", tags=["MODELS"])
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    if not settings.MODEL_ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Model management is disabled")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.MODEL_ADMIN_KEY):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+@router.get("", response_model=List[ModelVersionInfo], dependencies=[Depends(require_admin_key)])
+async def list_model_versions():
+    return model_registry.versions
+
+
+@router.post("/load", status_code=202, dependencies=[Depends(require_admin_key)])
+async def load_model_version(request: ModelLoadRequest):
+    try:
+        model_path = model_registry.load_version(request.filename)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Loading model version from {model_path}")
+    return {"msg": "Model loading started, it will be swapped in once warmed up", "path": model_path}
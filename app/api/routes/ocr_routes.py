@@ -1,18 +1,25 @@
-import io, logging, os
-from typing import List
-from PIL import Image
+import asyncio, logging
 from datetime import datetime
+from typing import List, Optional, Tuple
 from bson import ObjectId
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Path
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Path, Query, Response
 from starlette.responses import HTMLResponse, StreamingResponse
-from app.domain.models.display_result_model import DisplayRecognitionResult, Measurement
-from app.infrastructure.services.display_recognizer_service import DisplayRecognizerService
-from app.infrastructure.services.keras_number_recognizer import KerasNumberRecognizer
-from app.infrastructure.services.image_processor_service import ImageProcessorService
+from app.domain.models.display_result_model import DisplayRecognitionResult, Measurement, BatchItemResult, BatchRecognitionResult
+from app.domain.models.display_layout_model import DisplayLayout
+from app.domain.models.measurement_stats_model import MeasurementStats
+from app.domain.models.measurement_trends_model import MeasurementTrends, TrendPeriod
+from app.core.config import settings
+from app.infrastructure.services.model_registry import model_registry, ModelNotReadyError
+from app.infrastructure.services.recognition_executor import RecognitionQueueFullError
+from app.infrastructure.services.recognition_pipeline import RecognitionPipeline
+from app.infrastructure.services.result_cache import RecognitionResultCache
+from app.infrastructure.services.measurement_service import save_measurement, save_measurements, find_measurements, delete_measurement, iter_report_measurements
+from app.infrastructure.services.report_service import REPORT_MEDIA_TYPES, report_service
+from app.infrastructure.services.stats_service import get_user_stats
+from app.infrastructure.services.trends_service import get_user_trends
 from app.infrastructure.services.get_user_service import get_current_user
-from app.infrastructure.database.mongo_database import results_collection
-from app.utils.html_render import render_measurements_html
-from app.utils.pdf_generator import generate_pdf_from_html
+from app.utils.batch_upload import BatchUploadError, extract_zip_images, is_zip_upload
+from app.utils.pdf_stream import MeasurementsPdfStream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,134 +27,414 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ocr", tags=["OCR"])
 
-MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '../ia_models', 'tensoscan_model.keras')
-model = KerasNumberRecognizer(MODEL_PATH)
-preprocessor = ImageProcessorService()
-display_service = DisplayRecognizerService(model, preprocessor)
 
-try:
-    logger.info("Initializing NumberRecognizer model...")
-    # model = NumberRecognizer()
-    logger.info("Model initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize model: {str(e)}")
-    raise
+def get_pipeline() -> RecognitionPipeline:
+    try:
+        return model_registry.pipeline
+    except ModelNotReadyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(settings.RECOGNITION_RETRY_AFTER_SECONDS)}
+        )
+
+
+def _queue_full_exception() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Recognition service is busy, try again later",
+        headers={"Retry-After": str(settings.RECOGNITION_RETRY_AFTER_SECONDS)}
+    )
 
 
 @router.post("/recognize")
-async def recognize_numbers(image: UploadFile = File(...)):
+async def recognize_numbers(image: UploadFile = File(...), pipeline: RecognitionPipeline = Depends(get_pipeline)):
     if not image.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File uploaded is not an image")
     try:
         img_bytes = await image.read()
-        img = Image.open(io.BytesIO(img_bytes))
-        result = model.predict(img)
+        result = await pipeline.recognize_digit(img_bytes)
         return result
+    except RecognitionQueueFullError:
+        raise _queue_full_exception()
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         raise HTTPException(status_code=500, detail="Prediction failed")
 
 
+@router.get("/layouts", response_model=List[DisplayLayout])
+async def get_display_layouts():
+    return model_registry.layouts.layouts
+
+
 @router.post("/display-recognize", response_model=DisplayRecognitionResult)
-async def display_recognize(image: UploadFile = File(...), user = Depends(get_current_user)):
+async def display_recognize(
+    image: UploadFile = File(...),
+    layout: Optional[str] = Query(None, description="Display layout; detected from the display aspect ratio when omitted"),
+    user = Depends(get_current_user),
+    pipeline: RecognitionPipeline = Depends(get_pipeline)
+):
     try:
         logger.info(f"Received image: {image.filename}")
         if not image.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File uploaded is not an image")
+        if layout and layout not in pipeline.display_service.layouts:
+            raise HTTPException(status_code=400, detail=f"Unknown display layout '{layout}'")
 
         image_bytes = await image.read()
-        result = display_service.recognize_display(image_bytes)
-
-        # Save in MongoDB
-        await results_collection.insert_one({
-            "user_id": ObjectId(user["_id"]),
-            "filename": image.filename,
-            "result": result.model_dump(),
-            "timestamp": datetime.now()
-        })
+        image_hash = RecognitionResultCache.image_hash(image_bytes)
+        result = await pipeline.recognize_display(image_bytes, layout, image_hash)
+
+        # Save in MongoDB (retries of the same image are stored only once)
+        await save_measurement(ObjectId(user["_id"]), image.filename, result, image_hash)
 
         return result
 
+    except HTTPException:
+        raise
+    except RecognitionQueueFullError:
+        logger.warning("Recognition queue full, rejecting display recognition")
+        raise _queue_full_exception()
     except Exception as e:
         logger.error(f"Display recognition failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing image")
 
 
-@router.get("/measurements", response_model=List[Measurement])
-async def get_user_measurements(user=Depends(get_current_user)):
+async def _read_batch_images(files: List[UploadFile]) -> List[Tuple[str, bytes]]:
+    # Imágenes sueltas y zips se aplanan en una sola lista, en el orden de subida
+    max_image_bytes = settings.BATCH_MAX_IMAGE_MB * 1024 * 1024
+    max_total_bytes = settings.BATCH_MAX_TOTAL_MB * 1024 * 1024
+    images = []
+    total_bytes = 0
+    for upload in files:
+        data = await upload.read()
+        if is_zip_upload(upload.filename, upload.content_type):
+            # El zip solo puede usar lo que queda del presupuesto de imágenes y de bytes
+            extracted = extract_zip_images(
+                data, max_image_bytes,
+                max_images=settings.BATCH_MAX_IMAGES - len(images),
+                max_total_bytes=max_total_bytes - total_bytes
+            )
+            images.extend(extracted)
+            total_bytes += sum(len(image) for _, image in extracted)
+        elif upload.content_type and upload.content_type.startswith("image/"):
+            if len(data) > max_image_bytes:
+                raise BatchUploadError(f"Image '{upload.filename}' exceeds the maximum size per image")
+            if len(images) >= settings.BATCH_MAX_IMAGES:
+                raise BatchUploadError(f"A batch can contain at most {settings.BATCH_MAX_IMAGES} images")
+            total_bytes += len(data)
+            if total_bytes > max_total_bytes:
+                raise BatchUploadError("Batch exceeds the maximum total size")
+            images.append((upload.filename, data))
+        else:
+            raise BatchUploadError(f"File '{upload.filename}' is neither an image nor a zip archive")
+    return images
+
+
+async def _load_batch(images: List[UploadFile], layout: Optional[str], pipeline: RecognitionPipeline) -> List[Tuple[str, bytes]]:
+    if layout and layout not in pipeline.display_service.layouts:
+        raise HTTPException(status_code=400, detail=f"Unknown display layout '{layout}'")
+
     try:
-        user_id = user["_id"]
-        if isinstance(user_id, str):
-            user_id = ObjectId(user_id)
-
-        results_cursor = results_collection.find( { "user_id": user_id } )
-        results = await results_cursor.to_list(length=None)
-
-        formatted_results = []
-        for measure in results:
-            formatted_results.append({
-                "measurement_id": str(measure["_id"]),
-                "user_id": str(measure["user_id"]),
-                "filename": measure["filename"],
-                "result": {
-                    "high_pressure": measure["result"]["high_pressure"],
-                    "low_pressure": measure["result"]["low_pressure"],
-                    "pulse": measure["result"]["pulse"],
-                    "confidence": measure["result"]["confidence"],
-                },
-                "timestamp": measure["timestamp"]
-            })
-
-        return formatted_results
+        uploads = await _read_batch_images(images)
+    except BatchUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not uploads:
+        raise HTTPException(status_code=400, detail="No images found in the upload")
+
+    logger.info(f"Received batch of {len(uploads)} images")
+    return uploads
 
+
+async def _recognize_batch_item(pipeline: RecognitionPipeline, semaphore: asyncio.Semaphore, index: int,
+                                filename: str, image_bytes: bytes, image_hash: str,
+                                layout: Optional[str]) -> BatchItemResult:
+    # Los errores de una imagen se devuelven en su resultado, sin cortar el lote
+    try:
+        async with semaphore:
+            result = await pipeline.recognize_display(image_bytes, layout, image_hash)
+    except RecognitionQueueFullError:
+        return BatchItemResult(index=index, filename=filename, error="Recognition service is busy, try again later")
+    except ValueError as e:
+        return BatchItemResult(index=index, filename=filename, error=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Error retrieving measurements")
+        logger.error(f"Batch recognition failed for {filename}: {str(e)}")
+        return BatchItemResult(index=index, filename=filename, error="Error processing image")
+    return BatchItemResult(index=index, filename=filename, result=result)
+
+
+@router.post("/display-recognize/batch", response_model=BatchRecognitionResult)
+async def display_recognize_batch(
+    images: List[UploadFile] = File(..., description="Images and/or zip archives of images"),
+    layout: Optional[str] = Query(None, description="Display layout for every image; detected per image when omitted"),
+    user = Depends(get_current_user),
+    pipeline: RecognitionPipeline = Depends(get_pipeline)
+):
+    uploads = await _load_batch(images, layout, pipeline)
+    hashes = [RecognitionResultCache.image_hash(data) for _, data in uploads]
+
+    # Concurrencia limitada para no llenar la cola de reconocimiento con un solo lote
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+    items = await asyncio.gather(*(
+        _recognize_batch_item(pipeline, semaphore, idx, filename, data, hashes[idx], layout)
+        for idx, (filename, data) in enumerate(uploads)
+    ))
+
+    # Una sola escritura en MongoDB para todo el lote
+    recognized = [item for item in items if item.result is not None]
+    try:
+        stored = await save_measurements(
+            ObjectId(user["_id"]),
+            [(item.filename, item.result, hashes[item.index]) for item in recognized]
+        )
+    except Exception as e:
+        logger.error(f"Failed to store batch measurements: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error storing measurements")
+    for position in stored:
+        recognized[position].stored = True
+
+    return BatchRecognitionResult(
+        total=len(items),
+        succeeded=len(recognized),
+        failed=len(items) - len(recognized),
+        stored=len(stored),
+        items=items
+    )
+
+
+@router.post("/display-recognize/stream")
+async def display_recognize_stream(
+    images: List[UploadFile] = File(..., description="Images and/or zip archives of images"),
+    layout: Optional[str] = Query(None, description="Display layout for every image; detected per image when omitted"),
+    user = Depends(get_current_user),
+    pipeline: RecognitionPipeline = Depends(get_pipeline)
+):
+    """
+    Recognize many images and stream one NDJSON line per image, in completion order.
+    Every line is a BatchItemResult whose index is the image position in the upload.
+    """
+    uploads = await _load_batch(images, layout, pipeline)
+    user_id = ObjectId(user["_id"])
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+        hashes = [RecognitionResultCache.image_hash(data) for _, data in uploads]
+        tasks = [
+            asyncio.ensure_future(_recognize_batch_item(pipeline, semaphore, idx, filename, data, hashes[idx], layout))
+            for idx, (filename, data) in enumerate(uploads)
+        ]
+        # Los bytes quedan solo en las tareas y se liberan a medida que terminan
+        uploads.clear()
+        try:
+            for next_item in asyncio.as_completed(tasks):
+                item = await next_item
+                if item.result is not None:
+                    try:
+                        item.stored = await save_measurement(user_id, item.filename, item.result, hashes[item.index])
+                    except Exception as e:
+                        logger.error(f"Failed to store measurement for {item.filename}: {str(e)}")
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Cliente desconectado o error: las imágenes que aún no empezaron no se procesan;
+            # las que ya están en un worker terminan y siguen contando en la cola del executor
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.info(f"Recognition stream closed early, cancelled {len(pending)} images")
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _user_object_id(user) -> ObjectId:
+    user_id = user["_id"]
+    if isinstance(user_id, str):
+        user_id = ObjectId(user_id)
+    return user_id
 
 
-@router.get("/user/measurements/html", response_class=HTMLResponse)
-async def get_user_measurements_html(user=Depends(get_current_user)):
+@router.get("/measurements", response_model=List[Measurement])
+async def get_user_measurements(
+    response: Response,
+    limit: int = Query(settings.MEASUREMENTS_PAGE_SIZE, ge=1, le=settings.MEASUREMENTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Order by measurement time, newest first by default"),
+    date_from: Optional[datetime] = Query(None, description="Only measurements taken at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only measurements taken at or before this time"),
+    systolic_min: Optional[int] = Query(None, ge=0),
+    systolic_max: Optional[int] = Query(None, ge=0),
+    diastolic_min: Optional[int] = Query(None, ge=0),
+    diastolic_max: Optional[int] = Query(None, ge=0),
+    pulse_min: Optional[int] = Query(None, ge=0),
+    pulse_max: Optional[int] = Query(None, ge=0),
+    user=Depends(get_current_user)
+):
+    reading_ranges = {
+        "high_pressure": (systolic_min, systolic_max),
+        "low_pressure": (diastolic_min, diastolic_max),
+        "pulse": (pulse_min, pulse_max)
+    }
     try:
-        user_id = user["_id"]
-        if isinstance(user_id, str):
-            user_id = ObjectId(user_id)
+        results, next_cursor = await find_measurements(
+            _user_object_id(user), limit, cursor, order, date_from, date_to, reading_ranges
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to retrieve measurements: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving measurements")
 
-        measurements_cursor = results_collection.find({"user_id": user_id})
-        measurements = await measurements_cursor.to_list(length=None)
+    # La página siguiente se pide con este cursor; sin cabecera no hay más resultados
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    formatted_results = []
+    for measure in results:
+        formatted_results.append({
+            "measurement_id": str(measure["_id"]),
+            "user_id": str(measure["user_id"]),
+            "filename": measure["filename"],
+            "result": {
+                "high_pressure": measure["result"]["high_pressure"],
+                "low_pressure": measure["result"]["low_pressure"],
+                "pulse": measure["result"]["pulse"],
+                "confidence": measure["result"]["confidence"],
+                "digit_confidences": measure["result"].get("digit_confidences", []),
+            },
+            "timestamp": measure["timestamp"]
+        })
+
+    return formatted_results
 
-        if not measurements:
-            raise HTTPException(status_code=404, detail="No se encontraron mediciones para el usuario.")
 
-        html = render_measurements_html(measurements)
+@router.get("/measurements/stats", response_model=MeasurementStats)
+async def get_user_measurement_stats(
+    days: int = Query(30, ge=0, le=366, description="Number of most recent daily buckets"),
+    weeks: int = Query(12, ge=0, le=104, description="Number of most recent weekly buckets"),
+    user=Depends(get_current_user)
+):
+    try:
+        return await get_user_stats(_user_object_id(user), days, weeks)
+    except Exception as e:
+        logger.error(f"Failed to retrieve measurement statistics: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving statistics")
+
+
+@router.get("/measurements/trends", response_model=MeasurementTrends)
+async def get_user_measurement_trends(
+    period: TrendPeriod = Query("day", description="Group the measurements by day or ISO week"),
+    window: int = Query(7, ge=1, le=90, description="Number of periods of the moving averages"),
+    date_from: Optional[datetime] = Query(None, description="Only measurements taken at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only measurements taken at or before this time"),
+    user=Depends(get_current_user)
+):
+    try:
+        return await get_user_trends(_user_object_id(user), period, window, date_from, date_to)
+    except Exception as e:
+        logger.error(f"Failed to aggregate measurement trends: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving trends")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.replace("W/", "", 1) == etag for candidate in candidates)
+
+
+async def _report_response(kind: str, user, date_from: Optional[datetime], date_to: Optional[datetime],
+                           if_none_match: Optional[str], not_found_detail: str, headers: Optional[dict] = None) -> Response:
+    user_id = _user_object_id(user)
+    etag = await report_service.current_etag(user_id, kind, date_from, date_to)
+    if etag is None:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+
+    # Los informes no cambian hasta que cambian las mediciones: el cliente revalida con el ETag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if kind == "html":
+        # HTML en caché o, si no, generado desde el cursor y enviado según se escribe
+        report = report_service.cached(etag)
+        if report is None:
+            return StreamingResponse(
+                report_service.stream_html(user_id, etag, date_from, date_to),
+                media_type=REPORT_MEDIA_TYPES["html"], headers=headers
+            )
+    else:
+        report = await report_service.get_report(user_id, kind, etag, date_from, date_to)
+    return Response(content=report.content, media_type=report.media_type, headers=headers)
 
-        return HTMLResponse(content=html)
 
+@router.get("/user/measurements/html", response_class=HTMLResponse)
+async def get_user_measurements_html(
+    date_from: Optional[datetime] = Query(None, description="Only measurements taken at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only measurements taken at or before this time"),
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(get_current_user)
+):
+    try:
+        return await _report_response(
+            "html", user, date_from, date_to, if_none_match,
+            not_found_detail="No se encontraron mediciones para el usuario."
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/user/measurements/pdf")
-async def get_user_measurements_pdf(user=Depends(get_current_user)):
+async def get_user_measurements_pdf(
+    date_from: Optional[datetime] = Query(None, description="Only measurements taken at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only measurements taken at or before this time"),
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(get_current_user)
+):
     try:
-        user_id = user["_id"]
-        if isinstance(user_id, str):
-            user_id = ObjectId(user_id)
+        return await _report_response(
+            "pdf", user, date_from, date_to, if_none_match,
+            not_found_detail="No se encontraron mediciones.",
+            headers={"Content-Disposition": "attachment; filename=mediciones.pdf"}
+        )
 
-        measurements_cursor = results_collection.find({"user_id": user_id})
-        measurements = await measurements_cursor.to_list(length=None)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if not measurements:
-            raise HTTPException(status_code=404, detail="No se encontraron mediciones.")
 
-        html = render_measurements_html(measurements)
+@router.get("/user/measurements/pdf/stream")
+async def stream_user_measurements_pdf(
+    date_from: Optional[datetime] = Query(None, description="Only measurements taken at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only measurements taken at or before this time"),
+    user=Depends(get_current_user)
+):
+    try:
+        # Lee las mediciones con un cursor y envía el PDF página a página: la memoria no crece con el histórico
+        measurements = iter_report_measurements(
+            _user_object_id(user), date_from, date_to, batch_size=MeasurementsPdfStream.ROWS_PER_PAGE
+        )
+        try:
+            first = await measurements.__anext__()
+        except StopAsyncIteration:
+            raise HTTPException(status_code=404, detail="No se encontraron mediciones.")
 
-        pdf_file = generate_pdf_from_html(html)
+        async def rows():
+            yield first
+            async for measure in measurements:
+                yield measure
 
         return StreamingResponse(
-            pdf_file,
+            MeasurementsPdfStream().stream(rows()),
             media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=mediciones.pdf"}
+            headers={"Content-Disposition": "attachment; filename=mediciones.pdf", "Cache-Control": "private, no-store"}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -158,18 +445,14 @@ async def remove_measurement(measurement_id: str = Path(...), user=Depends(get_c
         if not ObjectId.is_valid(measurement_id):
             raise HTTPException(status_code=400, detail="Invalid measurement ID")
 
-        user_id = user["_id"]
-        if isinstance(user_id, str):
-            user_id = ObjectId(user_id)
-
-        result = await results_collection.delete_one({
-            "_id": ObjectId(measurement_id),
-            "user_id": user_id
-        })
+        # Borra la medición y la descuenta de las estadísticas del usuario
+        deleted = await delete_measurement(_user_object_id(user), ObjectId(measurement_id))
 
-        if result.deleted_count == 0:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Measurement not found or not authorized")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete measurement: {e}")
         raise HTTPException(status_code=500, detail="Error deleting measurement")
\ No newline at end of file
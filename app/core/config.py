@@ -10,8 +10,66 @@ class Settings(BaseSettings):
     API_PORT: int = int(os.getenv("API_PORT", 8000))
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
 
+    # Debug images of the recognition pipeline (off in production)
+    DEBUG_ARTIFACTS_ENABLED: bool = os.getenv("DEBUG_ARTIFACTS_ENABLED", "False").lower() == "true"
+    DEBUG_ARTIFACTS_DIR: str = os.getenv("DEBUG_ARTIFACTS_DIR", "debug_artifacts")
+    DEBUG_ARTIFACTS_MAX_MB: int = int(os.getenv("DEBUG_ARTIFACTS_MAX_MB", 200))
+
     # AI Model
     MODEL_PATH: str = os.getenv("MODEL_PATH", "ia_models/")
+    PREDICTOR_BACKEND: str = os.getenv("PREDICTOR_BACKEND", "keras")
+    NUMPY_MODEL_PATH: str = os.getenv("NUMPY_MODEL_PATH", "")
+    MODEL_WARMUP_ENABLED: bool = os.getenv("MODEL_WARMUP_ENABLED", "True").lower() == "true"
+    MODEL_RETIRE_GRACE_SECONDS: float = float(os.getenv("MODEL_RETIRE_GRACE_SECONDS", 30))
+    # Key required by the model management endpoints (disabled when empty)
+    MODEL_ADMIN_KEY: str = os.getenv("MODEL_ADMIN_KEY", "")
+    DISPLAY_LAYOUTS_PATH: str = os.getenv("DISPLAY_LAYOUTS_PATH", os.path.join(os.path.dirname(__file__), "display_layouts.json"))
+    DISPLAY_DETECTION_MAX_EDGE: int = int(os.getenv("DISPLAY_DETECTION_MAX_EDGE", 1024))
+    INFERENCE_MAX_BATCH_SIZE: int = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 64))
+    INFERENCE_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+
+    # Recognition result cache for repeated uploads
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+    RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("RESULT_CACHE_TTL_SECONDS", 600))
+
+    # Recognition workers ("thread" or "process")
+    RECOGNITION_BACKEND: str = os.getenv("RECOGNITION_BACKEND", "thread")
+    RECOGNITION_WORKERS: int = int(os.getenv("RECOGNITION_WORKERS", os.cpu_count() or 1))
+    RECOGNITION_MAX_QUEUE: int = int(os.getenv("RECOGNITION_MAX_QUEUE", 32))
+    RECOGNITION_RETRY_AFTER_SECONDS: int = int(os.getenv("RECOGNITION_RETRY_AFTER_SECONDS", 1))
+
+    # Batch uploads (multipart files or zip archives)
+    BATCH_MAX_IMAGES: int = int(os.getenv("BATCH_MAX_IMAGES", 100))
+    BATCH_MAX_IMAGE_MB: int = int(os.getenv("BATCH_MAX_IMAGE_MB", 10))
+    BATCH_MAX_TOTAL_MB: int = int(os.getenv("BATCH_MAX_TOTAL_MB", 200))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", os.cpu_count() or 1))
+
+    # Measurement history pages
+    MEASUREMENTS_PAGE_SIZE: int = int(os.getenv("MEASUREMENTS_PAGE_SIZE", 100))
+    MEASUREMENTS_MAX_PAGE_SIZE: int = int(os.getenv("MEASUREMENTS_MAX_PAGE_SIZE", 1000))
+
+    # HTML/PDF reports, rendered in worker processes and cached per user
+    REPORT_WORKERS: int = int(os.getenv("REPORT_WORKERS", 2))
+    REPORT_CACHE_MAX_MB: int = int(os.getenv("REPORT_CACHE_MAX_MB", 64))
+    REPORT_CACHE_TTL_SECONDS: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", 3600))
+    # Chart of the reports: svg (drawn directly), matplotlib (Agg, in memory) or plotly (Kaleido, slow)
+    CHART_BACKEND: str = os.getenv("CHART_BACKEND", "svg")
+
+    # Reference ranges for out-of-range counts in the trends (mmHg / bpm)
+    SYSTOLIC_HIGH: int = int(os.getenv("SYSTOLIC_HIGH", 140))
+    SYSTOLIC_LOW: int = int(os.getenv("SYSTOLIC_LOW", 90))
+    DIASTOLIC_HIGH: int = int(os.getenv("DIASTOLIC_HIGH", 90))
+    DIASTOLIC_LOW: int = int(os.getenv("DIASTOLIC_LOW", 60))
+    PULSE_HIGH: int = int(os.getenv("PULSE_HIGH", 100))
+    PULSE_LOW: int = int(os.getenv("PULSE_LOW", 50))
+
+    # Recognition job queue ("mongo" or "sqlite") and its workers
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "mongo")
+    JOB_QUEUE_SQLITE_PATH: str = os.getenv("JOB_QUEUE_SQLITE_PATH", "recognition_jobs.sqlite3")
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 1))
+    # Running jobs older than this are considered abandoned by a dead worker
+    JOB_TIMEOUT_SECONDS: int = int(os.getenv("JOB_TIMEOUT_SECONDS", 300))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
 
     # API Keys
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -23,6 +81,10 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Verified tokens -> user document, bounded by the token expiry as well
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 300))
+
     class Config:
         env_file = ".env"
 
@@ -1,11 +1,16 @@
 from abc import ABC, abstractmethod
 import numpy as np
+from app.domain.models.display_layout_model import DisplayLayout
 
 class ImageProcessorInterface(ABC):
     @abstractmethod
-    def extract_display_area(self, image: np.ndarray) -> np.ndarray:
+    def decode_image(self, image_bytes: bytes) -> np.ndarray:
         pass
 
     @abstractmethod
-    def crop_digit_areas(self, image: np.ndarray) -> list:
+    def extract_display_area(self, image: np.ndarray, layout: DisplayLayout) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def crop_digit_areas(self, image: np.ndarray, layout: DisplayLayout) -> list:
         pass
\ No newline at end of file
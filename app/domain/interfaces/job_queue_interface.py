@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.domain.models.recognition_job_model import RecognitionJob
+
+class JobQueueInterface(ABC):
+    @abstractmethod
+    async def submit(self, user_id: str, filename: str, image_bytes: bytes, layout: Optional[str] = None) -> RecognitionJob:
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str, user_id: str) -> Optional[RecognitionJob]:
+        pass
+
+    @abstractmethod
+    async def claim(self, worker_id: str) -> Optional[Tuple[RecognitionJob, bytes]]:
+        pass
+
+    @abstractmethod
+    async def complete(self, job_id: str, result: DisplayRecognitionResult):
+        pass
+
+    @abstractmethod
+    async def fail(self, job_id: str, error: str, retry: bool = False):
+        pass
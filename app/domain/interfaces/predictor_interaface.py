@@ -1,9 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import List
+import numpy as np
 from PIL import Image
 from app.domain.models.prediction_result_model import PredictionResult
 
 
 class PredictorInterface(ABC):
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        pass
+
     @abstractmethod
     def predict(self, image: Image) -> PredictionResult:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def predict_batch(self, images: List[np.ndarray]) -> List[PredictionResult]:
+        pass
+
+    @abstractmethod
+    def predict_preprocessed(self, batch: np.ndarray) -> List[PredictionResult]:
+        pass
@@ -0,0 +1,69 @@
+from typing import List, Tuple
+from pydantic import BaseModel, PrivateAttr, field_validator
+
+# (left, top, right, bottom) as fractions of the display width and height
+Region = Tuple[float, float, float, float]
+
+class DisplayLayout(BaseModel):
+    name: str
+    description: str = ""
+    frame_size: Tuple[int, int]
+    systolic: List[Region]
+    diastolic: List[Region]
+    pulse: List[Region]
+
+    _slices: List[Tuple[slice, slice]] = PrivateAttr(default_factory=list)
+
+    @field_validator("systolic", "diastolic", "pulse")
+    @classmethod
+    def check_regions(cls, regions: List[Region]) -> List[Region]:
+        if not regions:
+            raise ValueError("Every reading needs at least one digit region")
+        for left, top, right, bottom in regions:
+            if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+                raise ValueError(f"Invalid normalized region {(left, top, right, bottom)}")
+        return regions
+
+    def model_post_init(self, __context) -> None:
+        # Slices for the canonical frame are computed once per profile
+        self._slices = self.slices_for(self.frame_size)
+
+    @property
+    def regions(self) -> List[Region]:
+        return self.systolic + self.diastolic + self.pulse
+
+    @property
+    def aspect_ratio(self) -> float:
+        width, height = self.frame_size
+        return width / height
+
+    @property
+    def digit_counts(self) -> Tuple[int, int, int]:
+        return len(self.systolic), len(self.diastolic), len(self.pulse)
+
+    def slices_for(self, size: Tuple[int, int]) -> List[Tuple[slice, slice]]:
+        """
+        Row/column slices of every digit region for an image of the given size
+        :param size: (width, height) of the display image
+        :return: one (rows, columns) pair per digit, in display order
+        """
+        width, height = size
+        if tuple(size) == tuple(self.frame_size) and self._slices:
+            return self._slices
+        return [
+            (slice(round(top * height), round(bottom * height)), slice(round(left * width), round(right * width)))
+            for left, top, right, bottom in self.regions
+        ]
+
+    def split_fields(self, values: list) -> Tuple[list, list, list]:
+        """
+        Split per-digit values into systolic, diastolic and pulse groups
+        :param values: one value per digit, in display order
+        :return: the three groups
+        """
+        n_systolic, n_diastolic, _ = self.digit_counts
+        return (
+            values[:n_systolic],
+            values[n_systolic:n_systolic + n_diastolic],
+            values[n_systolic + n_diastolic:]
+        )
@@ -1,15 +1,34 @@
 from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel
 
 class DisplayRecognitionResult(BaseModel):
-    high_pressure: str
-    low_pressure: str
-    pulse: str
+    high_pressure: int
+    low_pressure: int
+    pulse: int
     confidence: float
+    # Confianza de cada dígito, en el orden del display
+    digit_confidences: List[float] = []
+    layout: Optional[str] = None
+    model_version: Optional[str] = None
 
 class Measurement(BaseModel):
     measurement_id: str
     user_id: str
     filename: str
     result: DisplayRecognitionResult
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class BatchItemResult(BaseModel):
+    index: int
+    filename: str
+    result: Optional[DisplayRecognitionResult] = None
+    error: Optional[str] = None
+    stored: bool = False
+
+class BatchRecognitionResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    stored: int
+    items: List[BatchItemResult]
@@ -0,0 +1,25 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class FieldStats(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    variance: Optional[float] = None
+    std_dev: Optional[float] = None
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+class StatsBucket(BaseModel):
+    key: str
+    count: int
+    systolic: FieldStats
+    diastolic: FieldStats
+    pulse: FieldStats
+
+class MeasurementStats(BaseModel):
+    count: int
+    systolic: FieldStats
+    diastolic: FieldStats
+    pulse: FieldStats
+    daily: List[StatsBucket]
+    weekly: List[StatsBucket]
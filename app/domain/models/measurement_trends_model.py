@@ -0,0 +1,26 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+TrendPeriod = Literal["day", "week"]
+
+class TrendPoint(BaseModel):
+    key: str
+    count: int
+    systolic_avg: Optional[float] = None
+    diastolic_avg: Optional[float] = None
+    pulse_avg: Optional[float] = None
+    systolic_moving_avg: Optional[float] = None
+    diastolic_moving_avg: Optional[float] = None
+    pulse_moving_avg: Optional[float] = None
+    high_count: int = 0
+    low_count: int = 0
+    pulse_out_of_range: int = 0
+
+class MeasurementTrends(BaseModel):
+    period: TrendPeriod
+    window: int
+    count: int
+    high_count: int
+    low_count: int
+    pulse_out_of_range: int
+    points: List[TrendPoint]
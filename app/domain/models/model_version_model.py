@@ -0,0 +1,12 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class ModelVersionInfo(BaseModel):
+    version: str
+    backend: str
+    path: str
+    loaded_at: datetime
+    active: bool = False
+
+class ModelLoadRequest(BaseModel):
+    filename: str
\ No newline at end of file
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel
+from app.domain.models.display_result_model import DisplayRecognitionResult
+
+JobStatus = Literal["queued", "running", "done", "failed"]
+
+class RecognitionJob(BaseModel):
+    job_id: str
+    user_id: str
+    filename: str
+    layout: Optional[str] = None
+    status: JobStatus = "queued"
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[DisplayRecognitionResult] = None
+    error: Optional[str] = None
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: JobStatus
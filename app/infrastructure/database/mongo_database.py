@@ -1,8 +1,43 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
 from app.core.config import settings
 
 client = AsyncIOMotorClient(settings.MONGODB_URL)
 db = client[settings.DB_NAME]
 
 users_collection = db["users"]
-results_collection = db["recognition_results"]
\ No newline at end of file
+results_collection = db["recognition_results"]
+jobs_collection = db["recognition_jobs"]
+stats_collection = db["user_stats"]
+
+
+async def ensure_indexes():
+    # One measurement per user and image content; older documents without a hash are left out
+    await results_collection.create_index(
+        [("user_id", ASCENDING), ("image_hash", ASCENDING)],
+        name="user_image_hash",
+        unique=True,
+        partialFilterExpression={"image_hash": {"$exists": True}}
+    )
+    # Historial de mediciones por usuario, ordenado y paginado por (timestamp, _id)
+    await results_collection.create_index(
+        [("user_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+        name="user_timestamp"
+    )
+
+    # Consultas por rango de lectura ("sistólica > 140")
+    for field in ("high_pressure", "low_pressure"):
+        await results_collection.create_index(
+            [("user_id", ASCENDING), (f"result.{field}", ASCENDING)],
+            name=f"user_{field}"
+        )
+
+    # Estadísticas por usuario: histórico, días y semanas
+    await stats_collection.create_index(
+        [("user_id", ASCENDING), ("period", ASCENDING), ("key", ASCENDING)],
+        name="user_period_key",
+        unique=True
+    )
+
+    # Workers claim the oldest queued job
+    await jobs_collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at")
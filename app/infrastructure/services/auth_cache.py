@@ -0,0 +1,83 @@
+import hashlib, threading, time
+from typing import Optional, Tuple
+from cachetools import TLRUCache
+
+CachedUser = Tuple[dict, float]
+
+
+class AuthCache:
+    """
+    Bounded cache of verified access token -> user document. Entries live for at most
+    ttl_seconds and never past the token's own expiry, so a hit can skip both the JWT
+    verification and the users lookup.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        # Reloj de pared: la caducidad del token (exp) es un timestamp epoch
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._time_to_use, timer=time.time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _time_to_use(self, key: str, value: CachedUser, now: float) -> float:
+        return min(now + self.ttl_seconds, value[1])
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        # No se guardan los tokens en claro
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            cached = self._cache.get(self.token_key(token))
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Copia para que nadie altere la entrada en caché
+        return dict(cached[0])
+
+    def put(self, token: str, user: dict, expires_at: Optional[float] = None):
+        """
+        Cache the user of a verified token
+        :param token: the access token
+        :param user: user document returned for the token
+        :param expires_at: token expiry (epoch seconds), from its exp claim
+        """
+        expires_at = expires_at if expires_at is not None else float("inf")
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._cache[self.token_key(token)] = (dict(user), expires_at)
+
+    def invalidate_user(self, user_id) -> int:
+        """
+        Drop every cached token of a user, to be called whenever the user document changes
+        :param user_id: _id of the user
+        :return: number of entries removed
+        """
+        user_id = str(user_id)
+        with self._lock:
+            keys = [key for key, (user, _) in self._cache.items() if str(user.get("_id")) == user_id]
+            for key in keys:
+                self._cache.pop(key, None)
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+from PIL import Image
+from typing import List
+from app.domain.models.display_layout_model import DisplayLayout
+
+# Input size expected by the digit classifier
+DIGIT_SIZE = 28
+
+
+def preprocess_image(image: Image) -> np.ndarray:
+    """
+    Turn a digit image into the (1, 28, 28, 1) input expected by the classifier
+    :param image: digit image in PIL format
+    :return: preprocessed digit
+    """
+    img = image.convert('L')
+    img = np.array(img)
+    img = (img * 255).astype(np.uint8)
+    img = cv2.resize(img, (DIGIT_SIZE, DIGIT_SIZE))
+    img = cv2.bitwise_not(img)
+    _, img = cv2.threshold(img, 78, 120, cv2.THRESH_BINARY_INV)
+    img = img.reshape(1, DIGIT_SIZE, DIGIT_SIZE, 1)
+    return img
+
+
+def preprocess_batch(images: List[np.ndarray]) -> np.ndarray:
+    """
+    Preprocess several digit crops into a single (N, 28, 28, 1) batch
+    :param images: digit crops in NumPy format
+    :return: stacked batch
+    """
+    return np.concatenate([preprocess_image(Image.fromarray(img)) for img in images])
+
+
+def pil_luma(image: np.ndarray) -> np.ndarray:
+    """
+    Grayscale conversion with the same integer rounding as PIL's convert('L');
+    cv2.cvtColor rounds differently and changes some pixels by one
+    :param image: (H, W, 3) uint8 array, channel 0 taken as R like PIL does
+    :return: (H, W) uint8 array
+    """
+    channels = image.astype(np.uint32)
+    luma = channels[..., 0] * 19595 + channels[..., 1] * 38470 + channels[..., 2] * 7471 + 0x8000
+    return (luma >> 16).astype(np.uint8)
+
+
+def preprocess_display(display: np.ndarray, layout: DisplayLayout) -> np.ndarray:
+    """
+    Build the (N, 28, 28, 1) batch for every digit region of a warped display in one
+    pass, with the same result as preprocess_image on each crop
+    :param display: display area warped into the layout frame, BGR or grayscale
+    :param layout: layout giving the digit regions
+    :return: preprocessed digits in display order
+    """
+    gray = pil_luma(display) if display.ndim == 3 else display.copy()
+    # El "* 255" en uint8 del camino original desborda: x -> (256 - x) % 256
+    np.negative(gray, out=gray)
+
+    height, width = gray.shape
+    slices = layout.slices_for((width, height))
+    batch = np.empty((len(slices), DIGIT_SIZE, DIGIT_SIZE, 1), dtype=np.uint8)
+    for idx, (rows, cols) in enumerate(slices):
+        # Cada región se redimensiona directamente dentro del batch
+        cv2.resize(gray[rows, cols], (DIGIT_SIZE, DIGIT_SIZE), dst=batch[idx, :, :, 0])
+
+    # bitwise_not y umbral sobre todo el batch a la vez, sin copias
+    flat = batch.reshape(-1, DIGIT_SIZE)
+    cv2.bitwise_not(flat, dst=flat)
+    cv2.threshold(flat, 78, 120, cv2.THRESH_BINARY_INV, dst=flat)
+    return batch
@@ -0,0 +1,67 @@
+import json, logging, math
+from typing import Dict, List, Optional
+from app.domain.models.display_layout_model import DisplayLayout
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownLayoutError(ValueError):
+    """Raised when a request asks for a layout that is not registered."""
+
+
+class DisplayLayoutRegistry:
+    """
+    Display layouts of the supported tensiometer models, loaded from a JSON file.
+    """
+
+    def __init__(self, layouts: List[DisplayLayout], default: Optional[str] = None):
+        if not layouts:
+            raise ValueError("At least one display layout is required")
+
+        self._layouts: Dict[str, DisplayLayout] = {layout.name: layout for layout in layouts}
+        self.default = default or layouts[0].name
+        if self.default not in self._layouts:
+            raise ValueError(f"Default layout '{self.default}' is not defined")
+
+    @classmethod
+    def from_file(cls, path: str) -> "DisplayLayoutRegistry":
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+
+        layouts = [DisplayLayout(**layout) for layout in config["layouts"]]
+        logger.info(f"Loaded {len(layouts)} display layouts from {path}")
+        return cls(layouts, config.get("default"))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._layouts)
+
+    @property
+    def layouts(self) -> List[DisplayLayout]:
+        return list(self._layouts.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layouts
+
+    def get(self, name: Optional[str] = None) -> DisplayLayout:
+        """
+        Look up a layout by name
+        :param name: layout name, None for the default layout
+        :return: the layout profile
+        """
+        name = name or self.default
+        if name not in self._layouts:
+            raise UnknownLayoutError(f"Unknown display layout '{name}'")
+        return self._layouts[name]
+
+    def detect(self, aspect_ratio: float) -> DisplayLayout:
+        """
+        Pick the layout whose display aspect ratio (width / height) is closest
+        :param aspect_ratio: aspect ratio of the detected display
+        :return: the best matching layout profile
+        """
+        if len(self._layouts) == 1 or aspect_ratio <= 0:
+            return self.get()
+
+        # Compare in log space so 0.5 and 2.0 are equally far from 1.0
+        return min(self._layouts.values(), key=lambda layout: abs(math.log(aspect_ratio / layout.aspect_ratio)))
@@ -1,76 +1,102 @@
-import io, os, cv2, logging
+import logging
 import numpy as np
-from PIL import Image
+from typing import List, Optional, Tuple
 from app.infrastructure.services.image_processor_service import ImageProcessorService
+from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry
+from app.infrastructure.services.digit_preprocessor import preprocess_display
 from app.domain.interfaces.predictor_interaface import PredictorInterface
+from app.domain.models.display_layout_model import DisplayLayout
 from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.domain.models.prediction_result_model import PredictionResult
+from app.utils.debug_artifacts import DebugArtifactWriter
 
 logger = logging.getLogger(__name__)
 
 class DisplayRecognizerService:
 
-    def __init__(self, model: PredictorInterface, image_processor: ImageProcessorService):
+    def __init__(self, model: PredictorInterface, image_processor: ImageProcessorService,
+                 layouts: DisplayLayoutRegistry, debug_writer: Optional[DebugArtifactWriter] = None):
         self.model = model
         self.image_processor = image_processor
+        self.layouts = layouts
+        self.debug_writer = debug_writer
 
-    def recognize_display(self, image_bytes: bytes) -> DisplayRecognitionResult:
+    def recognize_display(self, image_bytes: bytes, layout_name: Optional[str] = None) -> DisplayRecognitionResult:
         try:
-            img = Image.open(io.BytesIO(image_bytes))
-            temp_path = os.path.join(os.getcwd(), "display.jpg")
-            img.save(temp_path)
+            digit_batch, layout = self.extract_digit_batch(image_bytes, layout_name)
 
-            # Cargar con OpenCV
-            img_cv = cv2.imread(temp_path)
+            # Una sola pasada del modelo para todos los dígitos
+            results = self.model.predict_preprocessed(digit_batch)
 
-            display_area = self.image_processor.extract_display_area(img_cv)
-            if display_area is None:
-                raise ValueError("Could not detect display area")
-
-            display_area = cv2.resize(display_area, (1109, 1431))
-
-            digit_images = self.image_processor.crop_digit_areas(display_area)
-
-            predictions = []
-            confidences = []
-
-            # digit_paths = sorted(glob.glob(os.path.join("app", "*.png")))
-
-            for idx, item in enumerate(digit_images):
-                # Asegúrate de extraer la imagen solo si viene en tupla (imagen, algo más)
-                if isinstance(item, tuple):
-                    digit_np = item[0]
-                else:
-                    digit_np = item
-
-                try:
-                    # Validación opcional para asegurarte que es un ndarray
-                    if not isinstance(digit_np, np.ndarray):
-                        logger.error(f"Item at index {idx} is not a valid image array: {type(digit_np)}")
-                        continue
-
-                    digit_pil = Image.fromarray(digit_np)
-                    result = self.model.predict(digit_pil)
-
-                    predictions.append(str(result.digit))
-                    confidences.append(result.confidence)
-
-                    logger.info(f"Digit {idx} predicted: {result.digit} with confidence: {result.confidence}")
-
-                except Exception as e:
-                    logger.error(f"Failed to predict digit at index {idx}: {str(e)}")
-
-            high_pressure = ''.join(predictions[:3])
-            low_pressure = ''.join(predictions[3:5])
-            pulse = ''.join(predictions[5:])
-            avg_conf = sum(confidences) / len(confidences) if confidences else 0
-
-            return DisplayRecognitionResult(
-                high_pressure=high_pressure,
-                low_pressure=low_pressure,
-                pulse=pulse,
-                confidence=avg_conf
-            )
+            return self.build_result(results, layout)
 
         except Exception as e:
             logger.error(f"Error in display recognition service: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def extract_digit_batch(self, image_bytes: bytes, layout_name: Optional[str] = None) -> Tuple[np.ndarray, DisplayLayout]:
+        """
+        Locate the display in the uploaded image and preprocess every digit region
+        :param image_bytes: raw bytes of the uploaded image
+        :param layout_name: display layout to use, None to detect it from the display aspect ratio
+        :return: (N, 28, 28, 1) batch ready to be sent to the predictor, and the layout used
+        """
+        debug = self.debug_writer.new_session() if self.debug_writer else None
+
+        # Decodificar en memoria, sin pasar por disco
+        img_cv = self.image_processor.decode_image(image_bytes)
+
+        display_contour = self.image_processor.detect_display_contour(img_cv)
+        if display_contour is None:
+            raise ValueError("Could not detect display area")
+
+        if layout_name:
+            layout = self.layouts.get(layout_name)
+        else:
+            layout = self.layouts.detect(self.image_processor.quad_aspect_ratio(display_contour))
+
+        display_area = self.image_processor.warp_display(img_cv, display_contour, layout.frame_size)
+        digit_batch = preprocess_display(display_area, layout)
+
+        if debug:
+            debug.save_image("display.png", display_area)
+            for idx, digit_np in enumerate(self.image_processor.crop_digit_areas(display_area, layout)):
+                debug.save_image(f"digit_region_{idx}.png", digit_np)
+                debug.save_image(f"digit_input_{idx}.png", digit_batch[idx])
+
+        return digit_batch, layout
+
+    @staticmethod
+    def digits_to_number(digits: List[int]) -> int:
+        # [1, 2, 0] -> 120; un cero inicial es la posición vacía del display
+        number = 0
+        for digit in digits:
+            number = number * 10 + digit
+        return number
+
+    def build_result(self, results: List[PredictionResult], layout: DisplayLayout) -> DisplayRecognitionResult:
+        """
+        Join the digit predictions into the systolic, diastolic and pulse readings
+        :param results: predictions in display order
+        :param layout: layout the digits were cropped with
+        :return: structured recognition result
+        """
+        predictions = []
+        confidences = []
+        for idx, result in enumerate(results):
+            predictions.append(result.digit)
+            confidences.append(result.confidence)
+            logger.info(f"Digit {idx} predicted: {result.digit} with confidence: {result.confidence}")
+
+        high_pressure, low_pressure, pulse = layout.split_fields(predictions)
+        avg_conf = sum(confidences) / len(confidences) if confidences else 0
+
+        return DisplayRecognitionResult(
+            high_pressure=self.digits_to_number(high_pressure),
+            low_pressure=self.digits_to_number(low_pressure),
+            pulse=self.digits_to_number(pulse),
+            confidence=avg_conf,
+            digit_confidences=[round(conf, 4) for conf in confidences],
+            layout=layout.name,
+            model_version=self.model.version
+        )
\ No newline at end of file
@@ -5,10 +5,28 @@ from jose import jwt, JWTError
 
 from app.core.config import settings
 from app.infrastructure.database.mongo_database import users_collection
+from app.infrastructure.services.auth_cache import AuthCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Tokens ya verificados -> usuario, para no ir a Mongo en cada petición
+auth_cache = AuthCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id) -> int:
+    """
+    Forget the cached tokens of a user after changing or deleting it
+    :param user_id: _id of the user
+    :return: number of cached tokens dropped
+    """
+    return auth_cache.invalidate_user(user_id)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id = payload.get("sub")
@@ -21,6 +39,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
+        auth_cache.put(token, user, payload.get("exp"))
         return user
     except JWTError as e:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
@@ -1,11 +1,24 @@
-import cv2
+import cv2, logging
 import numpy as np
+from typing import Optional, Tuple
 from PIL.Image import Image
 
+from app.core.config import settings
 from app.domain.interfaces.image_processor_interface import ImageProcessorInterface
+from app.domain.models.display_layout_model import DisplayLayout
+
+logger = logging.getLogger(__name__)
 
 class ImageProcessorService(ImageProcessorInterface):
 
+    def __init__(self, detection_max_edge: Optional[int] = None):
+        """
+        :param detection_max_edge: long edge used to search the display (0 = full resolution)
+        """
+        if detection_max_edge is None:
+            detection_max_edge = settings.DISPLAY_DETECTION_MAX_EDGE
+        self.detection_max_edge = detection_max_edge
+
     def load_image(self, image_path: str) -> np.ndarray:
         """
         Load an image from disk and convert it to an array
@@ -21,6 +34,21 @@ class ImageProcessorService(ImageProcessorInterface):
             raise ValueError(f"Error loading image: {e}")
 
 
+    def decode_image(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode an uploaded image straight from memory, without touching the disk
+        :param image_bytes: encoded image bytes (JPEG, PNG, ...)
+        :return: image as a BGR NumPy array
+        """
+        # frombuffer wraps the upload bytes without copying them
+        buffer = np.frombuffer(memoryview(image_bytes), dtype=np.uint8)
+        # EXIF orientation is ignored, as the previous PIL -> JPEG -> imread round trip did
+        image = cv2.imdecode(buffer, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+        if image is None:
+            raise ValueError("Could not decode the uploaded image")
+        return image
+
+
     def process_image(self, image: np.ndarray, threshold: int = 127) -> np.ndarray:
         """
         Process image, convert to grayscale, apply thresholding and normalization
@@ -38,12 +66,103 @@ class ImageProcessorService(ImageProcessorInterface):
         return normalized_image
 
 
-    def extract_display_area(self, image: np.ndarray) -> np.ndarray:
+    def extract_display_area(self, image: np.ndarray, layout: DisplayLayout) -> np.ndarray:
         """
-                Detecta automáticamente el área del display de un tensiómetro en una imagen y la recorta.
+                Detecta automáticamente el área del display de un tensiómetro en una imagen y la endereza.
                 :param image: Imagen de entrada.
-                :return: Región de la imagen recortada correspondiente al display. Devuelve None si no se detecta.
+                :param layout: Perfil del display, define el tamaño del marco canónico de salida.
+                :return: Display corregido en perspectiva. Devuelve None si no se detecta.
                 """
+        display_contour = self.detect_display_contour(image)
+
+        # Si se encuentra el contorno del display, enderezarlo directamente al marco canónico
+        if display_contour is not None:
+            return self.warp_display(image, display_contour, layout.frame_size)
+
+        # Si no se detecta un área de display, devolver None
+        logger.warning("No se pudo detectar el área del display.")
+        return None
+
+    def warp_display(self, image: np.ndarray, contour: np.ndarray, output_size: tuple) -> np.ndarray:
+        """
+        Warp the display quadrilateral into an upright frame of the given size
+        :param image: full-resolution input image
+        :param contour: 4-point display contour in image coordinates
+        :param output_size: (width, height) of the output frame
+        :return: perspective-corrected display
+        """
+        width, height = output_size
+        source = self.order_quad_points(contour)
+        # warpPerspective no admite INTER_AREA: para reducir se endereza a escala nativa
+        # y después se promedia por áreas al marco canónico
+        native_width, native_height = self.quad_size(contour)
+        if native_width > width or native_height > height:
+            warp_width, warp_height = max(width, round(native_width)), max(height, round(native_height))
+        else:
+            warp_width, warp_height = width, height
+
+        target = np.array(
+            [[0, 0], [warp_width - 1, 0], [warp_width - 1, warp_height - 1], [0, warp_height - 1]], dtype=np.float32
+        )
+        matrix = cv2.getPerspectiveTransform(source, target)
+        warped = cv2.warpPerspective(image, matrix, (warp_width, warp_height), flags=cv2.INTER_LINEAR)
+        if (warp_width, warp_height) == (width, height):
+            return warped
+        return cv2.resize(warped, (width, height), interpolation=cv2.INTER_AREA)
+
+    @classmethod
+    def quad_size(cls, contour: np.ndarray) -> Tuple[float, float]:
+        """
+        Width and height of a quadrilateral, averaging opposite sides
+        :param contour: 4-point contour
+        :return: (width, height) in pixels
+        """
+        tl, tr, br, bl = cls.order_quad_points(contour)
+        width = (np.linalg.norm(tr - tl) + np.linalg.norm(br - bl)) / 2
+        height = (np.linalg.norm(bl - tl) + np.linalg.norm(br - tr)) / 2
+        return float(width), float(height)
+
+    @classmethod
+    def quad_aspect_ratio(cls, contour: np.ndarray) -> float:
+        """
+        Aspect ratio (width / height) of a quadrilateral, averaging opposite sides
+        :param contour: 4-point contour
+        :return: aspect ratio, 0 for degenerate quads
+        """
+        width, height = cls.quad_size(contour)
+        return width / height if height else 0.0
+
+    @staticmethod
+    def order_quad_points(contour: np.ndarray) -> np.ndarray:
+        """
+        Sort the corners of a quadrilateral as top-left, top-right, bottom-right, bottom-left
+        :param contour: 4-point contour
+        :return: float32 array of shape (4, 2)
+        """
+        points = contour.reshape(4, 2).astype(np.float32)
+        sums = points.sum(axis=1)
+        diffs = np.diff(points, axis=1).ravel()
+        return np.array([
+            points[np.argmin(sums)],
+            points[np.argmin(diffs)],
+            points[np.argmax(sums)],
+            points[np.argmax(diffs)]
+        ], dtype=np.float32)
+
+    def detect_display_contour(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Find the display quadrilateral, working on a downscaled copy when the image is large
+        :param image: BGR input image at full resolution
+        :return: 4-point contour in full-resolution coordinates, or None if not found
+        """
+        height, width = image.shape[:2]
+        scale = 1.0
+        if self.detection_max_edge and max(height, width) > self.detection_max_edge:
+            # Reducir antes de convertir: todo el pipeline trabaja sobre la copia pequeña
+            scale = self.detection_max_edge / max(height, width)
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
         # Convertir la imagen a escala de grises
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         gray = cv2.equalizeHist(gray)
@@ -57,9 +176,6 @@ class ImageProcessorService(ImageProcessorInterface):
         # También puedes probar con umbral adaptativo:
         thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
 
-        # Asegurarse de que thresh sea del tipo CV_8UC1
-        # thresh = np.uint8(thresh)
-
         # Buscar contornos en la imagen binarizada
         contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
@@ -67,13 +183,16 @@ class ImageProcessorService(ImageProcessorInterface):
         display_contour = None
         max_area = 0
 
+        # El área mínima se escala con la imagen para filtrar lo mismo que a resolución completa
+        min_area = 1000 * scale * scale
+
         # Encontrar el contorno más grande que probablemente sea el display
         for contour in contours:
             # Calcular el área del contorno
             area = cv2.contourArea(contour)
 
             # Filtrar contornos pequeños que no sean el display
-            if area > 1000:  # Ajusta este valor dependiendo del tamaño esperado del display
+            if area > min_area:  # Ajusta este valor dependiendo del tamaño esperado del display
                 # Aproximar el contorno a un cuadrilátero
                 peri = cv2.arcLength(contour, True)
                 approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
@@ -83,56 +202,29 @@ class ImageProcessorService(ImageProcessorInterface):
                     display_contour = approx
                     max_area = area
 
-        # Si se encuentra el contorno del display, recortar la región
-        if display_contour is not None:
-            # Obtener un bounding box alrededor del contorno
-            x, y, w, h = cv2.boundingRect(display_contour)
+        if display_contour is None:
+            return None
 
-            # Recortar el área del display de la imagen original
-            display_area = image[y:y + h, x:x + w]
-            return display_area
+        # Volver a coordenadas de la imagen original
+        if scale != 1.0:
+            display_contour = np.round(display_contour / scale).astype(np.int32)
+            display_contour[..., 0] = np.clip(display_contour[..., 0], 0, width - 1)
+            display_contour[..., 1] = np.clip(display_contour[..., 1], 0, height - 1)
 
-        # Si no se detecta un área de display, devolver None
-        print("No se pudo detectar el área del display.")
-        return None
+        return display_contour
 
-    def crop_digit_areas(self, image: np.ndarray) -> list:
+    def crop_digit_areas(self, image: np.ndarray, layout: DisplayLayout) -> list:
         """
-        Crops and saves images at the specified coordinates.
+        Crops the digit regions of a perspective-corrected display.
 
-        :param image: Input image in numpy array format.
-        :return: List with cropped digit images.
+        :param image: Display image in numpy array format.
+        :param layout: Display layout with the normalized digit regions.
+        :return: List with cropped digit images, in display order.
         """
+        height, width = image.shape[:2]
 
-        # Crop coordinates (x1: left, x2: top, y1: right, y2: bottom)
-        coordinates = [
-            (140, 160, 440, 620),  # Region 1
-            (450, 160, 750, 620),  # Region 2
-            (760, 160, 1060, 620),  # Region 3
-            (450, 640, 750, 1100),  # Region 4
-            (760, 640, 1060, 1100),  # Region 5
-            (740, 1150, 900, 1400),  # Region 6
-            (920, 1150, 1080, 1400)  # Region 7
-        ]
-
-        # Iterate over the coordinates and crop the image
-        cropped_images = []
-
-        for idx, (x1, x2, y1, y2) in enumerate(coordinates):
-            # Recortar la región de la imagen
-            cropped_img = image[x2:y2, x1:y1]
-
-            # Save the cropped image to a file
-            file_name = f"digit_region_{idx}.png"
-            cv2.imwrite(file_name, cropped_img)
-            print(f"Imagen guardada: {file_name}")
-            print(cropped_img.shape)
-
-            # Store the cropped image in the list
-            cropped_images.append(cropped_img)
-
-        # Return the cropped images (not coordinates)
-        return cropped_images
+        # Precomputed slices when the display is already in the layout's canonical frame
+        return [image[rows, columns] for rows, columns in layout.slices_for((width, height))]
 
 
     def detect_digit_positions(self, display_area: np.ndarray) -> list:
@@ -175,9 +267,6 @@ class ImageProcessorService(ImageProcessorInterface):
         :param target_size: target size, default (28, 28)
         :return: resized image
         """
-        image = cv2.resize(image, (300,300))
-        cv2.imshow("image", image)
-        cv2.waitKey(0)
         return cv2.resize(image, target_size)
 
 
@@ -0,0 +1,100 @@
+import asyncio, logging
+import numpy as np
+from typing import List, Optional, Tuple
+from app.domain.interfaces.predictor_interaface import PredictorInterface
+from app.domain.models.prediction_result_model import PredictionResult
+
+logger = logging.getLogger(__name__)
+
+class InferenceBatcher:
+    """
+    Asyncio queue in front of a predictor that groups the preprocessed digits of
+    many in-flight requests into a single forward pass.
+    """
+
+    def __init__(self, model: PredictorInterface, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def predict(self, digit: np.ndarray) -> PredictionResult:
+        results = await self.predict_batch(digit.reshape((1,) + digit.shape[-3:]))
+        return results[0]
+
+    async def predict_batch(self, batch: np.ndarray) -> List[PredictionResult]:
+        """
+        Queue the digits of one request and wait for their predictions
+        :param batch: (N, 28, 28, 1) preprocessed digits
+        :return: one prediction per digit, in the same order
+        """
+        if len(batch) == 0:
+            return []
+
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((batch, future))
+        return await future
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def _ensure_worker(self):
+        # The queue and the task must be created inside the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting requests until the batch is full or the wait expires
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            await self._flush(pending)
+
+    async def _flush(self, pending: List[Tuple[np.ndarray, asyncio.Future]]):
+        # Requests cancelled while waiting do not need a prediction
+        live = [(digits, future) for digits, future in pending if not future.done()]
+        if not live:
+            return
+
+        batch = live[0][0] if len(live) == 1 else np.concatenate([digits for digits, _ in live])
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self.model.predict_preprocessed, batch)
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(batch)} digits: {str(e)}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Batched inference: {len(batch)} digits from {len(live)} requests")
+
+        offset = 0
+        for digits, future in live:
+            if not future.done():
+                future.set_result(results[offset:offset + len(digits)])
+            offset += len(digits)
@@ -0,0 +1,255 @@
+import asyncio, json, logging, sqlite3, uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.domain.interfaces.job_queue_interface import JobQueueInterface
+from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.domain.models.recognition_job_model import RecognitionJob
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_BACKENDS = ("mongo", "sqlite")
+
+JOB_FIELDS = ("user_id", "filename", "layout", "status", "attempts", "created_at",
+              "started_at", "finished_at", "result", "error")
+
+TIMEOUT_ERROR = "Job timed out"
+
+
+def _new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class MongoJobQueue(JobQueueInterface):
+    """
+    Job queue stored in MongoDB. Workers claim jobs with an atomic find_one_and_update,
+    so any number of worker processes can share the collection.
+    """
+
+    def __init__(self, collection, timeout_seconds: int = 300, max_attempts: int = 3):
+        self.collection = collection
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def _to_job(doc: dict) -> RecognitionJob:
+        return RecognitionJob(job_id=doc["_id"], **{field: doc.get(field) for field in JOB_FIELDS})
+
+    async def submit(self, user_id: str, filename: str, image_bytes: bytes, layout: Optional[str] = None) -> RecognitionJob:
+        job = RecognitionJob(job_id=_new_job_id(), user_id=user_id, filename=filename, layout=layout, created_at=datetime.now())
+        doc = job.model_dump(exclude={"job_id"})
+        await self.collection.insert_one({"_id": job.job_id, "image": image_bytes, **doc})
+        return job
+
+    async def get(self, job_id: str, user_id: str) -> Optional[RecognitionJob]:
+        doc = await self.collection.find_one({"_id": job_id, "user_id": user_id}, {"image": 0})
+        return self._to_job(doc) if doc else None
+
+    async def claim(self, worker_id: str) -> Optional[Tuple[RecognitionJob, bytes]]:
+        await self._recover_stale_jobs()
+        doc = await self.collection.find_one_and_update(
+            {"status": "queued"},
+            {"$set": {"status": "running", "started_at": datetime.now(), "worker": worker_id}, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            return None
+        return self._to_job(doc), doc["image"]
+
+    async def complete(self, job_id: str, result: DisplayRecognitionResult):
+        # La imagen ya no hace falta una vez terminado el trabajo
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "done", "result": result.model_dump(), "error": None, "finished_at": datetime.now()},
+             "$unset": {"image": ""}}
+        )
+
+    async def fail(self, job_id: str, error: str, retry: bool = False):
+        if retry:
+            update = await self.collection.update_one(
+                {"_id": job_id, "attempts": {"$lt": self.max_attempts}},
+                {"$set": {"status": "queued", "error": error}}
+            )
+            if update.modified_count:
+                return
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": error, "finished_at": datetime.now()}, "$unset": {"image": ""}}
+        )
+
+    async def _recover_stale_jobs(self):
+        # Trabajos de workers caídos: se reintentan o se dan por fallidos
+        stale = {"status": "running", "started_at": {"$lt": datetime.now() - self.timeout}}
+        await self.collection.update_many(
+            {**stale, "attempts": {"$lt": self.max_attempts}},
+            {"$set": {"status": "queued"}}
+        )
+        await self.collection.update_many(
+            {**stale, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {"status": "failed", "error": TIMEOUT_ERROR, "finished_at": datetime.now()}, "$unset": {"image": ""}}
+        )
+
+
+class SQLiteJobQueue(JobQueueInterface):
+    """
+    Local stand-in for MongoJobQueue backed by a SQLite file, for single-host deployments
+    and development. Claims run inside an immediate transaction so several worker
+    processes on the same host can share the file.
+    """
+
+    def __init__(self, path: str, timeout_seconds: int = 300, max_attempts: int = 3):
+        self.path = path
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    layout TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    image BLOB,
+                    result TEXT,
+                    error TEXT,
+                    worker TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit: the transactions are opened explicitly where needed
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        # Fixed width so that timestamps sort as text
+        return datetime.now().isoformat(timespec="microseconds")
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> RecognitionJob:
+        values = {field: row[field] for field in JOB_FIELDS}
+        values["result"] = json.loads(row["result"]) if row["result"] else None
+        return RecognitionJob(job_id=row["job_id"], **values)
+
+    async def submit(self, user_id: str, filename: str, image_bytes: bytes, layout: Optional[str] = None) -> RecognitionJob:
+        return await asyncio.to_thread(self._submit, user_id, filename, image_bytes, layout)
+
+    def _submit(self, user_id: str, filename: str, image_bytes: bytes, layout: Optional[str]) -> RecognitionJob:
+        created_at = self._now()
+        job = RecognitionJob(job_id=_new_job_id(), user_id=user_id, filename=filename, layout=layout, created_at=created_at)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, user_id, filename, layout, status, image, created_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job.job_id, user_id, filename, layout, image_bytes, created_at)
+            )
+        return job
+
+    async def get(self, job_id: str, user_id: str) -> Optional[RecognitionJob]:
+        return await asyncio.to_thread(self._get, job_id, user_id)
+
+    def _get(self, job_id: str, user_id: str) -> Optional[RecognitionJob]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id)).fetchone()
+        return self._to_job(row) if row else None
+
+    async def claim(self, worker_id: str) -> Optional[Tuple[RecognitionJob, bytes]]:
+        return await asyncio.to_thread(self._claim, worker_id)
+
+    def _claim(self, worker_id: str) -> Optional[Tuple[RecognitionJob, bytes]]:
+        with closing(self._connect()) as conn:
+            # Write lock from the start: no other worker can claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._recover_stale_jobs(conn)
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, worker = ?, attempts = attempts + 1 WHERE job_id = ?",
+                    (self._now(), worker_id, row["job_id"])
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._to_job(row), row["image"]
+
+    def _recover_stale_jobs(self, conn: sqlite3.Connection):
+        cutoff = (datetime.now() - self.timeout).isoformat(timespec="microseconds")
+        conn.execute(
+            "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND started_at < ? AND attempts < ?",
+            (cutoff, self.max_attempts)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, image = NULL "
+            "WHERE status = 'running' AND started_at < ? AND attempts >= ?",
+            (TIMEOUT_ERROR, self._now(), cutoff, self.max_attempts)
+        )
+
+    async def complete(self, job_id: str, result: DisplayRecognitionResult):
+        await asyncio.to_thread(self._complete, job_id, result)
+
+    def _complete(self, job_id: str, result: DisplayRecognitionResult):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, image = NULL WHERE job_id = ?",
+                (result.model_dump_json(), self._now(), job_id)
+            )
+
+    async def fail(self, job_id: str, error: str, retry: bool = False):
+        await asyncio.to_thread(self._fail, job_id, error, retry)
+
+    def _fail(self, job_id: str, error: str, retry: bool):
+        with closing(self._connect()) as conn:
+            if retry:
+                updated = conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ? WHERE job_id = ? AND attempts < ?",
+                    (error, job_id, self.max_attempts)
+                ).rowcount
+                if updated:
+                    return
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, image = NULL WHERE job_id = ?",
+                (error, self._now(), job_id)
+            )
+
+
+def create_job_queue(backend: Optional[str] = None) -> JobQueueInterface:
+    """
+    Build the job queue configured in the settings
+    :param backend: "mongo" or "sqlite", defaults to JOB_QUEUE_BACKEND
+    :return: the job queue
+    """
+    backend = backend or settings.JOB_QUEUE_BACKEND
+    if backend == "mongo":
+        from app.infrastructure.database.mongo_database import jobs_collection
+        return MongoJobQueue(jobs_collection, settings.JOB_TIMEOUT_SECONDS, settings.JOB_MAX_ATTEMPTS)
+    if backend == "sqlite":
+        return SQLiteJobQueue(settings.JOB_QUEUE_SQLITE_PATH, settings.JOB_TIMEOUT_SECONDS, settings.JOB_MAX_ATTEMPTS)
+    raise ValueError(f"Unknown job queue backend '{backend}', expected one of {JOB_QUEUE_BACKENDS}")
+
+
+_job_queue: Optional[JobQueueInterface] = None
+
+
+def get_job_queue() -> JobQueueInterface:
+    # Created on first use so importing the routes does not touch the database
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = create_job_queue()
+    return _job_queue
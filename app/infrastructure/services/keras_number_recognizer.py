@@ -1,10 +1,12 @@
-import cv2
 import numpy as np
 from PIL import Image
+from typing import List
 import os, logging
 from tensorflow.keras.models import load_model
 from app.domain.interfaces.predictor_interaface import PredictorInterface
 from app.domain.models.prediction_result_model import PredictionResult
+from app.infrastructure.services.digit_preprocessor import preprocess_image, preprocess_batch
+from app.utils.model_version import file_version
 
 logger = logging.getLogger(__name__)
 
@@ -15,21 +17,47 @@ class KerasNumberRecognizer(PredictorInterface):
 
         self.model = load_model(model_path)
         self.input_shape = self.model.input_shape
-        logger.info(f"Model loaded. Input shape: {self.input_shape}")
+        self._version = file_version(model_path)
+        logger.info(f"Model loaded. Version: {self._version}, input shape: {self.input_shape}")
+
+    @property
+    def version(self) -> str:
+        return self._version
 
     def preprocess_image(self, image: Image) -> np.ndarray:
-        img = image.convert('L')
-        img = np.array(img)
-        img = (img * 255).astype(np.uint8)
-        img = cv2.resize(img, (28, 28))
-        img = cv2.bitwise_not(img)
-        _, img = cv2.threshold(img, 78, 120, cv2.THRESH_BINARY_INV)
-        img = img.reshape(1, 28, 28, 1)
-        return img
+        return preprocess_image(image)
 
     def predict(self, image: Image) -> PredictionResult:
         processed = self.preprocess_image(image)
-        prediction = self.model.predict(processed)
+        prediction = self.model.predict(processed, verbose=0)
         digit = int(np.argmax(prediction[0]))
         confidence = float(prediction[0][digit])
         return PredictionResult(digit=digit, confidence=confidence)
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[PredictionResult]:
+        """
+        Run a single forward pass over several digit crops
+        :param images: digit crops in NumPy format
+        :return: one prediction per crop, in the same order
+        """
+        if not images:
+            return []
+
+        return self.predict_preprocessed(preprocess_batch(images))
+
+    def predict_preprocessed(self, batch: np.ndarray) -> List[PredictionResult]:
+        """
+        Run a single forward pass over an already preprocessed batch
+        :param batch: (N, 28, 28, 1) digits, as built by digit_preprocessor
+        :return: one prediction per digit, in the same order
+        """
+        if len(batch) == 0:
+            return []
+
+        predictions = self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+        digits = np.argmax(predictions, axis=1)
+        return [
+            PredictionResult(digit=int(digit), confidence=float(scores[digit]))
+            for digit, scores in zip(digits, predictions)
+        ]
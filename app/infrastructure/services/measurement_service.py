@@ -0,0 +1,227 @@
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.infrastructure.database.mongo_database import results_collection
+from app.infrastructure.services.stats_service import record_measurement, record_measurements, remove_measurement_from_stats
+from app.utils.pagination import encode_cursor, keyset_filter, sort_spec
+
+logger = logging.getLogger(__name__)
+
+# Campos que devuelven las consultas, sin image_hash ni model_version
+MEASUREMENT_PROJECTION = {"user_id": 1, "filename": 1, "result": 1, "timestamp": 1}
+# Rango (mínimo, máximo) de una lectura; None deja ese extremo abierto
+ReadingRange = Tuple[Optional[int], Optional[int]]
+
+REPORT_PROJECTION = {"_id": 0, "timestamp": 1, "result.high_pressure": 1, "result.low_pressure": 1, "result.pulse": 1}
+
+
+def _measurement_upsert(user_id: ObjectId, filename: str, result: DisplayRecognitionResult, image_hash: str,
+                        timestamp: datetime) -> Tuple[dict, dict]:
+    # Filtro y update del upsert idempotente: solo se escribe si no existía ya
+    return (
+        {"user_id": user_id, "image_hash": image_hash},
+        {"$setOnInsert": {
+            "user_id": user_id,
+            "filename": filename,
+            "image_hash": image_hash,
+            "result": result.model_dump(),
+            "model_version": result.model_version,
+            "timestamp": timestamp
+        }}
+    )
+
+
+async def save_measurement(user_id: ObjectId, filename: str, result: DisplayRecognitionResult, image_hash: str) -> bool:
+    """
+    Store a recognition result, at most once per user and image content
+    :param user_id: owner of the measurement
+    :param filename: name of the uploaded file
+    :param result: recognition result
+    :param image_hash: content hash of the uploaded image
+    :return: True if a new measurement was stored, False if it already existed
+    """
+    timestamp = datetime.now()
+    try:
+        update = await results_collection.update_one(
+            *_measurement_upsert(user_id, filename, result, image_hash, timestamp),
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # A concurrent retry of the same upload won the race
+        return False
+
+    if update.upserted_id is None:
+        logger.info(f"Measurement for image {image_hash} already stored, skipping insert")
+        return False
+
+    # Solo las mediciones nuevas cuentan en las estadísticas
+    try:
+        await record_measurement(user_id, result.model_dump(), timestamp)
+    except Exception as e:
+        logger.error(f"Failed to update statistics of user {user_id}: {str(e)}")
+    return True
+
+
+async def save_measurements(user_id: ObjectId, measurements: List[Tuple[str, DisplayRecognitionResult, str]]) -> Set[int]:
+    """
+    Store several recognition results with a single bulk write, at most once per user and image content
+    :param user_id: owner of the measurements
+    :param measurements: (filename, result, image_hash) of every recognized image
+    :return: positions in measurements that were stored as new documents
+    """
+    if not measurements:
+        return set()
+
+    # La misma imagen repetida en el lote se escribe una sola vez
+    positions = {}
+    for position, (_, _, image_hash) in enumerate(measurements):
+        positions.setdefault(image_hash, position)
+    positions = list(positions.values())
+
+    timestamp = datetime.now()
+    operations = [
+        UpdateOne(*_measurement_upsert(user_id, *measurements[position], timestamp), upsert=True)
+        for position in positions
+    ]
+    try:
+        # Unordered: a duplicate does not stop the remaining writes
+        update = await results_collection.bulk_write(operations, ordered=False)
+        upserted = set(update.upserted_ids)
+    except BulkWriteError as e:
+        # Concurrent uploads of the same images hit the unique index, the rest are stored
+        upserted = {item["index"] for item in e.details.get("upserted", [])}
+        errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+        if errors:
+            raise
+
+    logger.info(f"Stored {len(upserted)} of {len(measurements)} measurements")
+    stored = {positions[index] for index in upserted}
+
+    try:
+        await record_measurements(user_id, [(measurements[position][1].model_dump(), timestamp) for position in stored])
+    except Exception as e:
+        logger.error(f"Failed to update statistics of user {user_id}: {str(e)}")
+    return stored
+
+
+async def delete_measurement(user_id: ObjectId, measurement_id: ObjectId) -> bool:
+    """
+    Delete a measurement of a user and remove it from the statistics
+    :param user_id: owner of the measurement
+    :param measurement_id: measurement to delete
+    :return: False if the user has no such measurement
+    """
+    measurement = await results_collection.find_one_and_delete(
+        {"_id": measurement_id, "user_id": user_id},
+        projection={"timestamp": 1, "result": 1}
+    )
+    if measurement is None:
+        return False
+
+    try:
+        await remove_measurement_from_stats(user_id, measurement)
+    except Exception as e:
+        logger.error(f"Failed to update statistics of user {user_id}: {str(e)}")
+    return True
+
+
+def _range(low, high) -> dict:
+    condition = {}
+    if low is not None:
+        condition["$gte"] = low
+    if high is not None:
+        condition["$lte"] = high
+    return condition
+
+
+def measurement_filter(user_id: ObjectId, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                       reading_ranges: Optional[Dict[str, ReadingRange]] = None) -> dict:
+    """
+    Query filter for the measurements of a user
+    :param user_id: owner of the measurements
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :param reading_ranges: result field (high_pressure, low_pressure, pulse) -> inclusive (min, max), None for open ends
+    :return: MongoDB filter
+    """
+    query = {"user_id": user_id}
+    if date_from or date_to:
+        query["timestamp"] = _range(date_from, date_to)
+    for field, (low, high) in (reading_ranges or {}).items():
+        if low is not None or high is not None:
+            query[f"result.{field}"] = _range(low, high)
+    return query
+
+
+async def find_measurements(user_id: ObjectId, limit: int, cursor: Optional[str] = None, order: str = "desc",
+                            date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                            reading_ranges: Optional[Dict[str, ReadingRange]] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of a user's measurements in (timestamp, _id) order, served by the user_timestamp index
+    :param user_id: owner of the measurements
+    :param limit: maximum number of measurements in the page
+    :param cursor: cursor returned with the previous page, None for the first one
+    :param order: "asc" or "desc"
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :param reading_ranges: inclusive ranges on the readings, see measurement_filter
+    :return: the measurements and the cursor of the next page (None on the last page)
+    """
+    query = {**measurement_filter(user_id, date_from, date_to, reading_ranges), **keyset_filter(cursor, order)}
+    # Un documento de más para saber si hay página siguiente
+    documents = await results_collection.find(query, MEASUREMENT_PROJECTION) \
+        .sort(sort_spec(order)).limit(limit + 1).to_list(length=limit + 1)
+
+    if len(documents) <= limit:
+        return documents, None
+    last = documents[limit - 1]
+    return documents[:limit], encode_cursor(last["timestamp"], last["_id"])
+
+
+async def find_report_measurements(user_id: ObjectId, date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None) -> List[dict]:
+    """
+    Measurements of a user with only the fields used by the reports, oldest first
+    :param user_id: owner of the measurements
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :return: projected measurement documents
+    """
+    cursor = results_collection.find(measurement_filter(user_id, date_from, date_to), REPORT_PROJECTION).sort(sort_spec("asc"))
+    return [document async for document in cursor]
+
+
+async def measurements_fingerprint(user_id: ObjectId, date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None) -> Tuple[int, Optional[datetime]]:
+    """
+    Count and latest timestamp of a user's measurements, both served by the user_timestamp index.
+    Any insert or delete changes at least one of them.
+    :param user_id: owner of the measurements
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :return: (count, latest timestamp or None)
+    """
+    query = measurement_filter(user_id, date_from, date_to)
+    count = await results_collection.count_documents(query)
+    latest = await results_collection.find_one(query, {"_id": 0, "timestamp": 1}, sort=sort_spec("desc"))
+    return count, latest["timestamp"] if latest else None
+
+
+async def iter_report_measurements(user_id: ObjectId, date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None, batch_size: int = 100) -> AsyncIterator[dict]:
+    """
+    Stream the report fields of a user's measurements, oldest first, without loading them all
+    :param user_id: owner of the measurements
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :param batch_size: documents fetched per round trip
+    :return: async iterator of projected measurement documents
+    """
+    cursor = results_collection.find(measurement_filter(user_id, date_from, date_to), REPORT_PROJECTION) \
+        .sort(sort_spec("asc")).batch_size(batch_size)
+    async for document in cursor:
+        yield document
@@ -0,0 +1,205 @@
+import asyncio, logging, os
+import numpy as np
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
+from app.domain.interfaces.predictor_interaface import PredictorInterface
+from app.domain.models.model_version_model import ModelVersionInfo
+from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry
+from app.infrastructure.services.digit_preprocessor import DIGIT_SIZE
+from app.infrastructure.services.display_recognizer_service import DisplayRecognizerService
+from app.infrastructure.services.image_processor_service import ImageProcessorService
+from app.infrastructure.services.inference_batcher import InferenceBatcher
+from app.infrastructure.services.predictor_factory import create_predictor, model_path_for
+from app.infrastructure.services.recognition_executor import RecognitionExecutor
+from app.infrastructure.services.recognition_pipeline import RecognitionPipeline
+from app.infrastructure.services.result_cache import RecognitionResultCache
+from app.utils.debug_artifacts import DebugArtifactWriter
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '../ia_models', 'tensoscan_model.keras'))
+MODELS_DIR = os.path.dirname(MODEL_PATH)
+
+# Model file extension -> predictor backend able to load it
+MODEL_EXTENSIONS = {".keras": "keras", ".npz": "numpy"}
+
+
+class ModelNotReadyError(Exception):
+    """Raised when recognition is requested before the model has been loaded."""
+
+
+class ModelRegistry:
+    """
+    Owns the versioned predictors and the recognition pipeline built on the active
+    one. Nothing is loaded at import time: the FastAPI lifespan calls start(), which
+    loads the model in the background. New versions can be loaded later and are
+    swapped in atomically once warm; requests already holding the previous pipeline
+    finish on it.
+    """
+
+    def __init__(self):
+        self.layouts: Optional[DisplayLayoutRegistry] = None
+        self.error: Optional[str] = None
+        self.loading: Optional[str] = None
+        self._pipeline: Optional[RecognitionPipeline] = None
+        self._versions: List[ModelVersionInfo] = []
+        self._executor: Optional[RecognitionExecutor] = None
+        self._cache: Optional[RecognitionResultCache] = None
+        self._debug_writer: Optional[DebugArtifactWriter] = None
+        self._warm_up_enabled = True
+        self._lock: Optional[asyncio.Lock] = None
+        self._tasks = set()
+        # Cada activación es una generación distinta, aunque se recargue el mismo fichero
+        self._generation = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._pipeline is not None
+
+    @property
+    def pipeline(self) -> RecognitionPipeline:
+        if self._pipeline is None:
+            raise ModelNotReadyError(self.error or "Model is still loading")
+        return self._pipeline
+
+    @property
+    def predictor(self) -> Optional[PredictorInterface]:
+        return self._pipeline.display_service.model if self._pipeline else None
+
+    @property
+    def result_cache_stats(self) -> Optional[dict]:
+        return self._cache.stats() if self._cache else None
+
+    @property
+    def versions(self) -> List[ModelVersionInfo]:
+        active = self._pipeline.model_version if self._pipeline else None
+        return [info.model_copy(update={"active": info.version == active}) for info in self._versions]
+
+    async def start(self, warm_up: bool = True):
+        """
+        Load the layouts now and the startup model in the background
+        :param warm_up: run dummy batches before a model starts serving
+        """
+        self._warm_up_enabled = warm_up
+        # Created here so it belongs to the server's event loop
+        self._lock = asyncio.Lock()
+        self.layouts = DisplayLayoutRegistry.from_file(settings.DISPLAY_LAYOUTS_PATH)
+        self._debug_writer = DebugArtifactWriter.from_settings()
+        self._cache = RecognitionResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL_SECONDS)
+
+        model_path = model_path_for(settings.PREDICTOR_BACKEND, MODEL_PATH)
+        self._executor = RecognitionExecutor(
+            backend=settings.RECOGNITION_BACKEND,
+            max_workers=settings.RECOGNITION_WORKERS,
+            max_queue_depth=settings.RECOGNITION_MAX_QUEUE,
+            layouts_path=settings.DISPLAY_LAYOUTS_PATH
+        )
+        self._spawn(self._activate(settings.PREDICTOR_BACKEND, model_path))
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._pipeline is not None:
+            await self._pipeline.batcher.close()
+            self._pipeline = None
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._debug_writer is not None:
+            self._debug_writer.shutdown()
+
+    def load_version(self, filename: str) -> str:
+        """
+        Start loading a model file from the models directory in the background
+        :param filename: model file name (.keras or .npz)
+        :return: resolved path of the model being loaded
+        """
+        backend = MODEL_EXTENSIONS.get(os.path.splitext(filename)[1])
+        if backend is None:
+            raise ValueError(f"Unsupported model file '{filename}', expected one of {list(MODEL_EXTENSIONS)}")
+
+        # Only files inside the models directory can be loaded
+        model_path = os.path.realpath(os.path.join(MODELS_DIR, filename))
+        if os.path.dirname(model_path) != os.path.realpath(MODELS_DIR):
+            raise ValueError(f"Model file '{filename}' must be inside the models directory")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found at {model_path}")
+
+        self._spawn(self._activate(backend, model_path))
+        return model_path
+
+    def _spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _activate(self, backend: str, model_path: str):
+        # One load at a time; the active pipeline keeps serving meanwhile
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self.loading = model_path
+            try:
+                logger.info(f"Loading model {model_path} ({backend})...")
+                predictor = await loop.run_in_executor(None, create_predictor, backend, model_path)
+                if self._warm_up_enabled:
+                    await loop.run_in_executor(None, self._warm_up, predictor)
+                worker_model = None
+                if self._executor.is_process_backend:
+                    # Los workers cargan su propia copia antes de declarar el modelo listo
+                    self._generation += 1
+                    worker_model = (backend, model_path, self._generation)
+                    sizes = self.warm_up_batch_sizes() if self._warm_up_enabled else []
+                    await loop.run_in_executor(None, self._executor.warm_up_workers, worker_model, sizes)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error = f"Failed to load model {model_path}: {str(e)}"
+                logger.error(self.error)
+                return
+            finally:
+                self.loading = None
+
+            display_service = DisplayRecognizerService(predictor, ImageProcessorService(), self.layouts, self._debug_writer)
+            batcher = InferenceBatcher(predictor, settings.INFERENCE_MAX_BATCH_SIZE, settings.INFERENCE_MAX_WAIT_MS)
+            pipeline = RecognitionPipeline(
+                display_service, batcher, self._executor, self._cache,
+                worker_model=worker_model
+            )
+
+            # Single reference swap: new requests get the new pipeline from here on
+            previous, self._pipeline = self._pipeline, pipeline
+            self.error = None
+            self._versions = [info for info in self._versions if info.version != predictor.version]
+            self._versions.append(ModelVersionInfo(
+                version=predictor.version, backend=backend, path=model_path, loaded_at=datetime.now()
+            ))
+            logger.info(f"Model {predictor.version} is now active")
+
+        # Also when the same version is reloaded: the previous pipeline owns its own batcher
+        if previous is not None:
+            self._spawn(self._retire(previous))
+
+    async def _retire(self, pipeline: RecognitionPipeline):
+        # Give in-flight requests on the previous version time to finish before closing its batcher
+        await asyncio.sleep(settings.MODEL_RETIRE_GRACE_SECONDS)
+        await pipeline.batcher.close()
+        if pipeline.worker_model is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._executor.retire_worker_model, pipeline.worker_model)
+            except Exception as e:
+                logger.error(f"Failed to unload model {pipeline.model_version} from the workers: {str(e)}")
+        logger.info(f"Model {pipeline.model_version} retired")
+
+    def warm_up_batch_sizes(self) -> List[int]:
+        # Single digits, one display of each layout and a full micro-batch
+        sizes = {1, settings.INFERENCE_MAX_BATCH_SIZE}
+        sizes.update(sum(layout.digit_counts) for layout in self.layouts.layouts)
+        return sorted(sizes)
+
+    def _warm_up(self, predictor: PredictorInterface):
+        for size in self.warm_up_batch_sizes():
+            predictor.predict_preprocessed(np.zeros((size, DIGIT_SIZE, DIGIT_SIZE, 1), dtype=np.uint8))
+        logger.info(f"Model {predictor.version} warmed up")
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,204 @@
+import json, logging, os
+import numpy as np
+from PIL import Image
+from typing import Callable, Dict, List
+from numpy.lib.stride_tricks import sliding_window_view
+from app.domain.interfaces.predictor_interaface import PredictorInterface
+from app.domain.models.prediction_result_model import PredictionResult
+from app.infrastructure.services.digit_preprocessor import preprocess_image, preprocess_batch
+from app.utils.model_version import file_version
+
+logger = logging.getLogger(__name__)
+
+Layer = Callable[[np.ndarray], np.ndarray]
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+def _activation(name) -> Callable[[np.ndarray], np.ndarray]:
+    name = name or "linear"
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation '{name}'")
+    return ACTIVATIONS[name]
+
+
+def _pair(value) -> tuple:
+    return tuple(value) if isinstance(value, (list, tuple)) else (value, value)
+
+
+def _pad_same(x: np.ndarray, window: tuple, strides: tuple, fill: float = 0.0) -> np.ndarray:
+    # Same padding rule as TensorFlow: the extra pixel goes to the bottom/right
+    pads = [(0, 0)]
+    for size, k, s in zip(x.shape[1:3], window, strides):
+        total = max((-(-size // s) - 1) * s + k - size, 0)
+        pads.append((total // 2, total - total // 2))
+    pads.append((0, 0))
+    return np.pad(x, pads, constant_values=fill)
+
+
+def _windows(x: np.ndarray, window: tuple, strides: tuple) -> np.ndarray:
+    # (N, H', W', C, kh, kw) view over the input, no copy until it is reduced
+    return sliding_window_view(x, window, axis=(1, 2))[:, ::strides[0], ::strides[1]]
+
+
+def _conv2d(config: dict, kernel: np.ndarray, bias: np.ndarray = None) -> Layer:
+    if _pair(config.get("dilation_rate", 1)) != (1, 1) or config.get("groups", 1) != 1:
+        raise ValueError("Only undilated, ungrouped Conv2D layers are supported")
+
+    strides = _pair(config.get("strides", 1))
+    padding = config.get("padding", "valid")
+    activation = _activation(config.get("activation"))
+    window = kernel.shape[:2]
+
+    def forward(x: np.ndarray) -> np.ndarray:
+        if padding == "same":
+            x = _pad_same(x, window, strides)
+        out = np.tensordot(_windows(x, window, strides), kernel, axes=((3, 4, 5), (2, 0, 1)))
+        if bias is not None:
+            out += bias
+        return activation(out)
+
+    return forward
+
+
+def _pooling(config: dict, reduce: Callable) -> Layer:
+    window = _pair(config.get("pool_size", 2))
+    strides = _pair(config.get("strides") or window)
+    padding = config.get("padding", "valid")
+
+    def forward(x: np.ndarray) -> np.ndarray:
+        if padding == "same":
+            x = _pad_same(x, window, strides, fill=-np.inf if reduce is np.max else np.nan)
+        return reduce(_windows(x, window, strides), axis=(-2, -1))
+
+    return forward
+
+
+def _dense(config: dict, kernel: np.ndarray, bias: np.ndarray = None) -> Layer:
+    activation = _activation(config.get("activation"))
+
+    def forward(x: np.ndarray) -> np.ndarray:
+        out = x @ kernel
+        if bias is not None:
+            out += bias
+        return activation(out)
+
+    return forward
+
+
+def _batch_normalization(config: dict, *weights: np.ndarray) -> Layer:
+    weights = list(weights)
+    gamma = weights.pop(0) if config.get("scale", True) else 1.0
+    beta = weights.pop(0) if config.get("center", True) else 0.0
+    mean, variance = weights
+    factor = gamma / np.sqrt(variance + config.get("epsilon", 1e-3))
+    shift = beta - mean * factor
+    return lambda x: x * factor + shift
+
+
+def _build_layer(class_name: str, config: dict, weights: List[np.ndarray]) -> Layer:
+    if class_name in ("InputLayer", "Dropout", "SpatialDropout2D", "GaussianNoise", "GaussianDropout"):
+        # Identity at inference time
+        return lambda x: x
+    if class_name == "Rescaling":
+        scale, offset = config.get("scale", 1.0), config.get("offset", 0.0)
+        return lambda x: x * scale + offset
+    if class_name == "Conv2D":
+        return _conv2d(config, *weights)
+    if class_name == "MaxPooling2D":
+        return _pooling(config, np.max)
+    if class_name == "AveragePooling2D":
+        return _pooling(config, np.nanmean)
+    if class_name == "GlobalAveragePooling2D":
+        return lambda x: x.mean(axis=(1, 2))
+    if class_name == "GlobalMaxPooling2D":
+        return lambda x: x.max(axis=(1, 2))
+    if class_name == "Flatten":
+        return lambda x: x.reshape(x.shape[0], -1)
+    if class_name == "Reshape":
+        target = tuple(config["target_shape"])
+        return lambda x: x.reshape((x.shape[0],) + target)
+    if class_name == "Dense":
+        return _dense(config, *weights)
+    if class_name == "Activation":
+        return _activation(config.get("activation"))
+    if class_name == "ReLU":
+        return ACTIVATIONS["relu"]
+    if class_name == "Softmax":
+        return ACTIVATIONS["softmax"]
+    if class_name == "BatchNormalization":
+        return _batch_normalization(config, *weights)
+    raise ValueError(f"Unsupported layer type '{class_name}'")
+
+
+class NumpyNumberRecognizer(PredictorInterface):
+    """
+    Digit classifier running the weights exported from the Keras model
+    (see app/utils/export_numpy_model.py) with plain NumPy, without TensorFlow.
+    """
+
+    def __init__(self, model_path: str):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found at {model_path}")
+
+        with np.load(model_path, allow_pickle=False) as data:
+            specs = json.loads(data["__layers__"].item())
+            self.metadata = json.loads(data["__meta__"].item())
+            self.layers = [
+                _build_layer(spec["class_name"], spec["config"], [data[name].astype(np.float32) for name in spec["weights"]])
+                for spec in specs
+            ]
+
+        self._version = file_version(model_path)
+        logger.info(f"NumPy model loaded. Version: {self._version}, layers: {len(self.layers)}")
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the network on a preprocessed batch
+        :param batch: (N, 28, 28, 1) input batch
+        :return: (N, 10) class probabilities
+        """
+        x = batch.astype(np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def predict(self, image: Image) -> PredictionResult:
+        prediction = self.forward(preprocess_image(image))
+        digit = int(np.argmax(prediction[0]))
+        confidence = float(prediction[0][digit])
+        return PredictionResult(digit=digit, confidence=confidence)
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[PredictionResult]:
+        if not images:
+            return []
+
+        return self.predict_preprocessed(preprocess_batch(images))
+
+    def predict_preprocessed(self, batch: np.ndarray) -> List[PredictionResult]:
+        if len(batch) == 0:
+            return []
+
+        predictions = self.forward(batch)
+
+        digits = np.argmax(predictions, axis=1)
+        return [
+            PredictionResult(digit=int(digit), confidence=float(scores[digit]))
+            for digit, scores in zip(digits, predictions)
+        ]
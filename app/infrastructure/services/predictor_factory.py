@@ -0,0 +1,34 @@
+import os
+from app.core.config import settings
+from app.domain.interfaces.predictor_interaface import PredictorInterface
+
+# "keras" runs the original model with TensorFlow, "numpy" the exported weights without it
+PREDICTOR_BACKENDS = ("keras", "numpy")
+
+
+def model_path_for(backend: str, keras_model_path: str) -> str:
+    """
+    Model file used by a predictor backend
+    :param backend: predictor backend name
+    :param keras_model_path: path of the .keras model
+    :return: path of the file the backend loads
+    """
+    if backend == "numpy":
+        return settings.NUMPY_MODEL_PATH or os.path.splitext(keras_model_path)[0] + ".npz"
+    return keras_model_path
+
+
+def create_predictor(backend: str, model_path: str) -> PredictorInterface:
+    """
+    Build a predictor, importing TensorFlow only when the Keras backend is used
+    :param backend: predictor backend name
+    :param model_path: model file for that backend
+    :return: the predictor
+    """
+    if backend == "keras":
+        from app.infrastructure.services.keras_number_recognizer import KerasNumberRecognizer
+        return KerasNumberRecognizer(model_path)
+    if backend == "numpy":
+        from app.infrastructure.services.numpy_number_recognizer import NumpyNumberRecognizer
+        return NumpyNumberRecognizer(model_path)
+    raise ValueError(f"Unknown predictor backend '{backend}', expected one of {PREDICTOR_BACKENDS}")
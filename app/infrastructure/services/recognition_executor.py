@@ -0,0 +1,190 @@
+import asyncio, logging, multiprocessing, os, threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.domain.models.display_result_model import DisplayRecognitionResult
+
+logger = logging.getLogger(__name__)
+
+# Services owned by each worker process of the process backend, one per loaded model.
+# Keyed on (predictor backend, model path, generation): every activation gets its own copy,
+# which stays loaded until the registry retires it explicitly.
+WorkerModelKey = Tuple[str, str, int]
+_worker_services: Dict[WorkerModelKey, object] = {}
+_worker_layouts_path = None
+
+# Maximum wait for every worker to pick up its share of a broadcast job
+BROADCAST_TIMEOUT_SECONDS = 300
+
+
+class RecognitionQueueFullError(Exception):
+    """Raised when the recognition backend already has too many pending jobs."""
+
+
+def _init_worker(layouts_path: str):
+    # Los modelos llegan después con warm_up_worker; el padre mantiene su propia copia
+    # para el endpoint de dígitos sueltos y la información de versión
+    global _worker_layouts_path
+    _worker_layouts_path = layouts_path
+
+
+def _worker_service_for(model_key: WorkerModelKey):
+    # Imported here so worker processes only pay for what they use
+    from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry
+    from app.infrastructure.services.display_recognizer_service import DisplayRecognizerService
+    from app.infrastructure.services.image_processor_service import ImageProcessorService
+    from app.infrastructure.services.predictor_factory import create_predictor
+    from app.utils.debug_artifacts import DebugArtifactWriter
+
+    if model_key not in _worker_services:
+        predictor_backend, model_path, _ = model_key
+        _worker_services[model_key] = DisplayRecognizerService(
+            create_predictor(predictor_backend, model_path),
+            ImageProcessorService(),
+            DisplayLayoutRegistry.from_file(_worker_layouts_path),
+            DebugArtifactWriter.from_settings()
+        )
+        logger.info(f"Recognition worker ready with model {model_path}")
+    return _worker_services[model_key]
+
+
+def recognize_in_worker(model_key: WorkerModelKey, image_bytes: bytes,
+                        layout_name: Optional[str] = None) -> DisplayRecognitionResult:
+    return _worker_service_for(model_key).recognize_display(image_bytes, layout_name)
+
+
+def warm_up_worker(model_key: WorkerModelKey, batch_sizes: Sequence[int]) -> str:
+    # Carga el modelo en este worker y lo calienta con lotes vacíos
+    from app.infrastructure.services.digit_preprocessor import DIGIT_SIZE
+
+    predictor = _worker_service_for(model_key).model
+    for size in batch_sizes:
+        predictor.predict_preprocessed(np.zeros((size, DIGIT_SIZE, DIGIT_SIZE, 1), dtype=np.uint8))
+    return predictor.version
+
+
+def drop_worker_model(model_key: WorkerModelKey) -> bool:
+    return _worker_services.pop(model_key, None) is not None
+
+
+def _run_on_every_worker(barrier, fn: Callable, *args):
+    result = fn(*args)
+    # Hold this worker until all the others have their copy of the job, so none runs two
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    return os.getpid(), result
+
+
+class RecognitionExecutor:
+    """
+    Runs CPU-bound recognition work outside the event loop, on a thread pool or
+    on a process pool with the model loaded once per process.
+    """
+
+    BACKENDS = ("thread", "process")
+
+    def __init__(self, backend: str = "thread", max_workers: Optional[int] = None,
+                 max_queue_depth: int = 32, layouts_path: Optional[str] = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown recognition backend '{backend}', expected one of {self.BACKENDS}")
+
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._pool: Executor
+        # Un broadcast cada vez: dos a la vez podrían repartirse los workers y bloquearse
+        self._broadcast_lock = threading.Lock()
+
+        if backend == "process":
+            if layouts_path is None:
+                raise ValueError("The process backend needs the layouts path to load in each worker")
+            # TensorFlow is not fork-safe, workers must start from a clean interpreter
+            self._mp_context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._mp_context,
+                initializer=_init_worker,
+                initargs=(layouts_path,)
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="recognition")
+
+        logger.info(f"Recognition executor started: backend={backend}, max_queue_depth={max_queue_depth}")
+
+    @property
+    def is_process_backend(self) -> bool:
+        return self.backend == "process"
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable, *args):
+        """
+        Dispatch a job to the pool, refusing it when the queue is already full
+        :param fn: function to run (must be picklable for the process backend)
+        :param args: positional arguments for the function
+        :return: the function result
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_queue_depth:
+                raise RecognitionQueueFullError(f"Recognition queue is full ({self._pending} pending jobs)")
+            self._pending += 1
+
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # El hueco se libera cuando termina el trabajo del pool, no cuando se cancela la petición:
+        # si el cliente se desconecta, el trabajo ya empezado sigue ocupando un worker
+        future.add_done_callback(lambda _: self._release())
+        # Cancelar la espera cancela también el trabajo si aún no había empezado
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def broadcast(self, fn: Callable, *args, timeout: float = BROADCAST_TIMEOUT_SECONDS) -> List:
+        """
+        Run a job once in every worker process, spawning the workers that are not running yet.
+        Blocking: call it from a thread.
+        :param fn: picklable function to run in each worker
+        :param args: positional arguments for the function
+        :param timeout: maximum wait for all the workers to take their job
+        :return: the result of each worker
+        """
+        if not self.is_process_backend:
+            raise RuntimeError("Only the process backend has worker processes")
+
+        with self._broadcast_lock, self._mp_context.Manager() as manager:
+            barrier = manager.Barrier(self.max_workers, timeout=timeout)
+            futures = [self._pool.submit(_run_on_every_worker, barrier, fn, *args) for _ in range(self.max_workers)]
+            results = [future.result() for future in futures]
+
+        pids = {pid for pid, _ in results}
+        if len(pids) < self.max_workers:
+            logger.warning(f"Broadcast reached {len(pids)} of {self.max_workers} recognition workers")
+        return [result for _, result in results]
+
+    def warm_up_workers(self, model_key: WorkerModelKey, batch_sizes: Sequence[int]):
+        """
+        Start every worker process and load and warm the model in each, so that no request pays for it
+        """
+        self.broadcast(warm_up_worker, model_key, list(batch_sizes))
+        logger.info(f"Model {model_key[1]} loaded in {self.max_workers} recognition workers")
+
+    def retire_worker_model(self, model_key: WorkerModelKey):
+        """
+        Unload a model from every worker process once no request uses it any more
+        """
+        self.broadcast(drop_worker_model, model_key)
+        logger.info(f"Model {model_key[1]} unloaded from the recognition workers")
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,75 @@
+import io
+import numpy as np
+from typing import Optional
+from PIL import Image
+from app.domain.models.display_result_model import DisplayRecognitionResult
+from app.domain.models.prediction_result_model import PredictionResult
+from app.infrastructure.services.digit_preprocessor import preprocess_image
+from app.infrastructure.services.display_recognizer_service import DisplayRecognizerService
+from app.infrastructure.services.inference_batcher import InferenceBatcher
+from app.infrastructure.services.recognition_executor import RecognitionExecutor, WorkerModelKey, recognize_in_worker
+from app.infrastructure.services.result_cache import RecognitionResultCache
+
+
+def decode_digit_image(image_bytes: bytes) -> np.ndarray:
+    # Devuelve el dígito ya preprocesado, (1, 28, 28, 1)
+    return preprocess_image(Image.open(io.BytesIO(image_bytes)))
+
+
+class RecognitionPipeline:
+    """
+    Async entry point for recognition that keeps OpenCV and model work off the event loop.
+    """
+
+    def __init__(self, display_service: DisplayRecognizerService, batcher: InferenceBatcher,
+                 executor: RecognitionExecutor, cache: Optional[RecognitionResultCache] = None,
+                 worker_model: Optional[WorkerModelKey] = None):
+        self.display_service = display_service
+        self.batcher = batcher
+        self.executor = executor
+        self.cache = cache
+        # Model the worker processes use when this pipeline runs on the process backend
+        self.worker_model = worker_model
+
+    @property
+    def model_version(self) -> str:
+        return self.display_service.model.version
+
+    async def recognize_display(self, image_bytes: bytes, layout_name: Optional[str] = None,
+                                image_hash: Optional[str] = None) -> DisplayRecognitionResult:
+        """
+        Recognize the readings of a tensiometer display
+        :param image_bytes: raw bytes of the uploaded image
+        :param layout_name: display layout to use, None to auto-detect it
+        :param image_hash: content hash of the image, enables the result cache
+        :return: structured recognition result
+        """
+        if self.cache is None or image_hash is None:
+            return await self._recognize_display(image_bytes, layout_name)
+
+        key = self.cache.key(image_hash, self.model_version, layout_name)
+        result = self.cache.get(key)
+        if result is None:
+            result = await self._recognize_display(image_bytes, layout_name)
+            self.cache.put(key, result)
+        return result
+
+    async def _recognize_display(self, image_bytes: bytes, layout_name: Optional[str]) -> DisplayRecognitionResult:
+        if self.executor.is_process_backend:
+            # Worker processes own their model, the whole recognition runs there
+            return await self.executor.run(recognize_in_worker, self.worker_model, image_bytes, layout_name)
+
+        digit_batch, layout = await self.executor.run(
+            self.display_service.extract_digit_batch, image_bytes, layout_name
+        )
+        predictions = await self.batcher.predict_batch(digit_batch)
+        return self.display_service.build_result(predictions, layout)
+
+    async def recognize_digit(self, image_bytes: bytes) -> PredictionResult:
+        """
+        Recognize a single digit image
+        :param image_bytes: raw bytes of the uploaded image
+        :return: digit prediction
+        """
+        digit = await self.executor.run(decode_digit_image, image_bytes)
+        return await self.batcher.predict(digit)
@@ -0,0 +1,194 @@
+import asyncio, hashlib, logging, multiprocessing, threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from cachetools import TTLCache
+from app.core.config import settings
+from app.infrastructure.services.measurement_service import find_report_measurements, iter_report_measurements, measurements_fingerprint
+from app.utils.html_render import ROWS_PER_CHUNK, aiter_measurements_html
+
+logger = logging.getLogger(__name__)
+
+REPORT_MEDIA_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+
+
+def render_report(kind: str, measurements: List[dict]) -> bytes:
+    """
+    Render a measurements report. Runs in the report worker processes.
+    :param kind: "html" or "pdf"
+    :param measurements: projected measurement documents, oldest first
+    :return: report bytes
+    """
+    # Imported here so only the report workers load xhtml2pdf
+    from app.utils.html_render import render_measurements_html
+    from app.utils.pdf_generator import generate_pdf_from_html
+
+    if kind == "html":
+        return render_measurements_html(measurements).encode("utf-8")
+    # El gráfico va como imagen en memoria dentro del HTML que convierte xhtml2pdf
+    return generate_pdf_from_html(render_measurements_html(measurements, for_pdf=True)).getvalue()
+
+
+class Report:
+    def __init__(self, kind: str, etag: str, content: bytes):
+        self.kind = kind
+        self.etag = etag
+        self.content = content
+
+    @property
+    def media_type(self) -> str:
+        return REPORT_MEDIA_TYPES[self.kind]
+
+
+class ReportService:
+    """
+    Renders HTML/PDF reports on a process pool, off the event loop, and keeps the
+    bytes in a size-bounded cache. Entries are keyed on the user's measurement count
+    and latest timestamp, so any insert or delete invalidates them; the same key is
+    the ETag, which lets unchanged reports be answered with 304 before rendering.
+    """
+
+    def __init__(self, workers: int = 2, cache_max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.workers = max(1, workers)
+        self._cache = TTLCache(maxsize=cache_max_bytes, ttl=ttl_seconds, getsizeof=lambda report: len(report.content))
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Renders in progress: repeated clicks wait for the same render
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "ReportService":
+        return cls(settings.REPORT_WORKERS, settings.REPORT_CACHE_MAX_MB * 1024 * 1024, settings.REPORT_CACHE_TTL_SECONDS)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use; spawn so that workers never inherit TensorFlow
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    @staticmethod
+    def etag_for(user_id: ObjectId, kind: str, date_from: Optional[datetime], date_to: Optional[datetime],
+                 fingerprint: Tuple[int, Optional[datetime]]) -> str:
+        parts = [str(user_id), kind, str(date_from), str(date_to), str(fingerprint[0]), str(fingerprint[1])]
+        return '"' + hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest() + '"'
+
+    async def current_etag(self, user_id: ObjectId, kind: str, date_from: Optional[datetime] = None,
+                           date_to: Optional[datetime] = None) -> Optional[str]:
+        """
+        ETag of the report as it would be rendered now
+        :return: the ETag, or None if the user has no measurements in the range
+        """
+        fingerprint = await measurements_fingerprint(user_id, date_from, date_to)
+        if fingerprint[0] == 0:
+            return None
+        return self.etag_for(user_id, kind, date_from, date_to, fingerprint)
+
+    async def get_report(self, user_id: ObjectId, kind: str, etag: str, date_from: Optional[datetime] = None,
+                         date_to: Optional[datetime] = None) -> Report:
+        """
+        Cached report, rendered in a worker process on a miss
+        :param user_id: owner of the measurements
+        :param kind: "html" or "pdf"
+        :param etag: value returned by current_etag
+        :param date_from: only measurements taken at or after this time
+        :param date_to: only measurements taken at or before this time
+        :return: the report
+        """
+        report = self.cached(etag)
+        if report is not None:
+            return report
+
+        pending = self._pending.get(etag)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[etag] = future
+        try:
+            measurements = await find_report_measurements(user_id, date_from, date_to)
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(self._get_pool(), render_report, kind, measurements)
+            report = Report(kind, etag, content)
+            self._store(report)
+            logger.info(f"Rendered {kind} report for user {user_id}: {len(content)} bytes")
+            future.set_result(report)
+            return report
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marca la excepción como recuperada aunque nadie más esté esperando
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(etag, None)
+
+    def cached(self, etag: str) -> Optional[Report]:
+        with self._lock:
+            report = self._cache.get(etag)
+            if report is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return report
+
+    def _store(self, report: Report):
+        with self._lock:
+            try:
+                self._cache[report.etag] = report
+            except ValueError:
+                # Larger than the whole cache: served but not kept
+                pass
+
+    async def stream_html(self, user_id: ObjectId, etag: str, date_from: Optional[datetime] = None,
+                          date_to: Optional[datetime] = None) -> AsyncIterator[bytes]:
+        """
+        Render the HTML report straight from a database cursor, sending each chunk as
+        soon as it is ready. The chunks are kept while they fit in the cache, so the
+        next request with the same ETag is served from memory.
+        :param user_id: owner of the measurements
+        :param etag: value returned by current_etag
+        :param date_from: only measurements taken at or after this time
+        :param date_to: only measurements taken at or before this time
+        :return: async iterator of HTML bytes
+        """
+        measurements = iter_report_measurements(user_id, date_from, date_to, batch_size=ROWS_PER_CHUNK)
+        parts: Optional[List[bytes]] = []
+        size = 0
+        async for chunk in aiter_measurements_html(measurements):
+            data = chunk.encode("utf-8")
+            if parts is not None:
+                size += len(data)
+                parts.append(data)
+                if size > self._cache.maxsize:
+                    # Demasiado grande para la caché: se deja de acumular
+                    parts = None
+            yield data
+
+        if parts is not None:
+            self._store(Report("html", etag, b"".join(parts)))
+            logger.info(f"Rendered html report for user {user_id}: {size} bytes")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size_bytes": self._cache.currsize,
+                "max_bytes": self._cache.maxsize,
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+report_service = ReportService.from_settings()
@@ -0,0 +1,56 @@
+import hashlib, threading
+from typing import Optional, Tuple
+from cachetools import TTLCache
+from app.domain.models.display_result_model import DisplayRecognitionResult
+
+CacheKey = Tuple[str, str, str]
+
+class RecognitionResultCache:
+    """
+    Bounded LRU/TTL cache of display recognition results, keyed on the image
+    content hash, the model version and the requested layout.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_hash(image_bytes: bytes) -> str:
+        # blake2b is faster than sha256 and 128 bits are plenty to tell uploads apart
+        return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+    @staticmethod
+    def key(image_hash: str, model_version: str, layout_name: Optional[str] = None) -> CacheKey:
+        return image_hash, model_version, layout_name or "auto"
+
+    def get(self, key: CacheKey) -> Optional[DisplayRecognitionResult]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Callers get their own copy so they cannot alter the cached entry
+        return result.model_copy()
+
+    def put(self, key: CacheKey, result: DisplayRecognitionResult):
+        with self._lock:
+            self._cache[key] = result.model_copy()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
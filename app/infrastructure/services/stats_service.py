@@ -0,0 +1,292 @@
+import logging, math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.domain.models.measurement_stats_model import FieldStats, MeasurementStats, StatsBucket
+from app.infrastructure.database.mongo_database import results_collection, stats_collection
+
+logger = logging.getLogger(__name__)
+
+# Campo de las estadísticas -> campo del resultado reconocido
+STATS_FIELDS = {"systolic": "high_pressure", "diastolic": "low_pressure", "pulse": "pulse"}
+
+ALL_PERIOD = "all"
+DAY_PERIOD = "day"
+WEEK_PERIOD = "week"
+# Marca por usuario de estadísticas inicializadas: se crea al empezar la reconstrucción
+# y recibe initialized_at al terminarla
+REBUILD_PERIOD = "rebuild"
+
+
+def reading_values(result: dict) -> Dict[str, int]:
+    """
+    Numeric readings of a recognition result, skipping fields that are not a number
+    :param result: stored recognition result
+    :return: stats field -> value
+    """
+    values = {}
+    for field, source in STATS_FIELDS.items():
+        value = parse_reading(result.get(source))
+        if value is not None:
+            values[field] = value
+    return values
+
+
+def parse_reading(value) -> Optional[int]:
+    # Lecturas numéricas o, en documentos sin migrar, cadenas de dígitos
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def bucket_keys(timestamp: datetime) -> List[Tuple[str, str]]:
+    # Histórico completo, día y semana ISO de la medición
+    return [
+        (ALL_PERIOD, ALL_PERIOD),
+        (DAY_PERIOD, timestamp.strftime("%Y-%m-%d")),
+        (WEEK_PERIOD, timestamp.strftime("%G-W%V"))
+    ]
+
+
+def bucket_range(period: str, key: str) -> Optional[Tuple[datetime, datetime]]:
+    if period == DAY_PERIOD:
+        start = datetime.strptime(key, "%Y-%m-%d")
+        return start, start + timedelta(days=1)
+    if period == WEEK_PERIOD:
+        start = datetime.strptime(key + "-1", "%G-W%V-%u")
+        return start, start + timedelta(weeks=1)
+    return None
+
+
+def _stats_update(values: Dict[str, int], sign: int) -> dict:
+    # count/sum/sumsq con $inc para poder sumar y restar; min/max solo al insertar
+    inc = {"count": sign}
+    for field, value in values.items():
+        inc[f"{field}.count"] = sign
+        inc[f"{field}.sum"] = sign * value
+        inc[f"{field}.sumsq"] = sign * value * value
+    update = {"$inc": inc}
+    if sign > 0 and values:
+        update["$min"] = {f"{field}.min": value for field, value in values.items()}
+        update["$max"] = {f"{field}.max": value for field, value in values.items()}
+    return update
+
+
+def _bucket_filter(user_id: ObjectId, period: str, key: str) -> dict:
+    return {"user_id": user_id, "period": period, "key": key}
+
+
+async def record_measurements(user_id: ObjectId, measurements: Iterable[Tuple[dict, datetime]]):
+    """
+    Add new measurements to the user's statistics with a single bulk write
+    :param user_id: owner of the measurements
+    :param measurements: (result, timestamp) of every newly stored measurement, already in the results collection
+    """
+    if await _ensure_stats(user_id):
+        # La reconstrucción ya ha contado las mediciones recién guardadas
+        return
+    operations = [
+        UpdateOne(_bucket_filter(user_id, period, key), _stats_update(reading_values(result), 1), upsert=True)
+        for result, timestamp in measurements
+        for period, key in bucket_keys(timestamp)
+    ]
+    if operations:
+        await stats_collection.bulk_write(operations, ordered=False)
+
+
+async def record_measurement(user_id: ObjectId, result: dict, timestamp: datetime):
+    await record_measurements(user_id, [(result, timestamp)])
+
+
+async def remove_measurement_from_stats(user_id: ObjectId, measurement: dict):
+    """
+    Subtract a deleted measurement from the user's statistics
+    :param user_id: owner of the measurement
+    :param measurement: the deleted document
+    """
+    if await _ensure_stats(user_id):
+        # Reconstruidas sin la medición, que ya no está en la colección
+        return
+    values = reading_values(measurement.get("result", {}))
+    for period, key in bucket_keys(measurement["timestamp"]):
+        bucket = await stats_collection.find_one_and_update(
+            _bucket_filter(user_id, period, key),
+            _stats_update(values, -1),
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket is None:
+            continue
+        if bucket.get("count", 0) <= 0:
+            await stats_collection.delete_one({"_id": bucket["_id"]})
+            continue
+
+        # Si se borró un extremo hay que recalcularlo desde las mediciones del bucket
+        stale = [
+            field for field, value in values.items()
+            if value in (bucket.get(field, {}).get("min"), bucket.get(field, {}).get("max"))
+        ]
+        if stale:
+            await _recompute_extremes(user_id, period, key, stale)
+
+
+async def _recompute_extremes(user_id: ObjectId, period: str, key: str, fields: List[str]):
+    query = {"user_id": user_id}
+    time_range = bucket_range(period, key)
+    if time_range:
+        query["timestamp"] = {"$gte": time_range[0], "$lt": time_range[1]}
+    projection = {"_id": 0, **{f"result.{STATS_FIELDS[field]}": 1 for field in fields}}
+
+    extremes: Dict[str, List[int]] = {}
+    async for document in results_collection.find(query, projection):
+        for field, value in reading_values(document.get("result", {})).items():
+            if field in fields:
+                current = extremes.setdefault(field, [value, value])
+                current[0], current[1] = min(current[0], value), max(current[1], value)
+
+    update = {"$set": {}, "$unset": {}}
+    for field in fields:
+        if field in extremes:
+            update["$set"][f"{field}.min"], update["$set"][f"{field}.max"] = extremes[field]
+        else:
+            update["$unset"][f"{field}.min"] = ""
+            update["$unset"][f"{field}.max"] = ""
+    await stats_collection.update_one(_bucket_filter(user_id, period, key), {k: v for k, v in update.items() if v})
+
+
+async def rebuild_user_stats(user_id: ObjectId) -> int:
+    """
+    Recompute all the statistics of a user from the stored measurements
+    :param user_id: owner of the measurements
+    :return: number of measurements counted
+    """
+    buckets: Dict[Tuple[str, str], dict] = {}
+    count = 0
+    projection = {"_id": 0, "timestamp": 1, **{f"result.{source}": 1 for source in STATS_FIELDS.values()}}
+    async for document in results_collection.find({"user_id": user_id}, projection):
+        count += 1
+        values = reading_values(document.get("result", {}))
+        for period, key in bucket_keys(document["timestamp"]):
+            bucket = buckets.setdefault((period, key), {"count": 0})
+            bucket["count"] += 1
+            for field, value in values.items():
+                stats = bucket.setdefault(field, {"count": 0, "sum": 0, "sumsq": 0, "min": value, "max": value})
+                stats["count"] += 1
+                stats["sum"] += value
+                stats["sumsq"] += value * value
+                stats["min"] = min(stats["min"], value)
+                stats["max"] = max(stats["max"], value)
+
+    # Un upsert con $set por bucket sobre el índice único: sin huecos ni DuplicateKeyError
+    # si otra petición suma una medición a la vez
+    operations = []
+    for (period, key), bucket in buckets.items():
+        update = {"$set": bucket}
+        missing = [field for field in STATS_FIELDS if field not in bucket]
+        if missing:
+            update["$unset"] = {field: "" for field in missing}
+        operations.append(UpdateOne(_bucket_filter(user_id, period, key), update, upsert=True))
+    if operations:
+        await stats_collection.bulk_write(operations, ordered=False)
+
+    # Buckets que ya no tienen mediciones
+    stale = [
+        document["_id"]
+        async for document in stats_collection.find(
+            {"user_id": user_id, "period": {"$in": [ALL_PERIOD, DAY_PERIOD, WEEK_PERIOD]}},
+            {"period": 1, "key": 1}
+        )
+        if (document["period"], document["key"]) not in buckets
+    ]
+    if stale:
+        await stats_collection.delete_many({"_id": {"$in": stale}})
+
+    await stats_collection.update_one(
+        _marker_filter(user_id), {"$set": {"initialized_at": datetime.utcnow()}}, upsert=True
+    )
+    logger.info(f"Rebuilt statistics of user {user_id} from {count} measurements")
+    return count
+
+
+def _marker_filter(user_id: ObjectId) -> dict:
+    return _bucket_filter(user_id, REBUILD_PERIOD, REBUILD_PERIOD)
+
+
+async def _ensure_stats(user_id: ObjectId) -> bool:
+    """
+    Build the statistics of a user from the stored measurements the first time they are used,
+    so measurements stored before the incremental statistics are never left out
+    :param user_id: owner of the measurements
+    :return: True if this call rebuilt them
+    """
+    if await stats_collection.find_one(_marker_filter(user_id), {"_id": 1}) is not None:
+        # Inicializadas, o reconstruyéndose en otra petición: se siguen aplicando los $inc
+        return False
+
+    # Solo la petición que inserta la marca reconstruye
+    try:
+        result = await stats_collection.update_one(
+            _marker_filter(user_id), {"$setOnInsert": {"started_at": datetime.utcnow()}}, upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    if result.upserted_id is None:
+        return False
+
+    try:
+        await rebuild_user_stats(user_id)
+    except Exception:
+        # Permite reintentarlo en la siguiente operación
+        await stats_collection.delete_one(_marker_filter(user_id))
+        raise
+    return True
+
+
+def _field_stats(stats: Optional[dict]) -> FieldStats:
+    if not stats or stats.get("count", 0) <= 0:
+        return FieldStats(count=0)
+    count = stats["count"]
+    mean = stats["sum"] / count
+    # Varianza poblacional a partir de las sumas acumuladas
+    variance = max(stats["sumsq"] / count - mean * mean, 0.0)
+    return FieldStats(
+        count=count, mean=mean, variance=variance, std_dev=math.sqrt(variance),
+        min=stats.get("min"), max=stats.get("max")
+    )
+
+
+def _to_bucket(document: dict) -> StatsBucket:
+    return StatsBucket(
+        key=document["key"],
+        count=document.get("count", 0),
+        **{field: _field_stats(document.get(field)) for field in STATS_FIELDS}
+    )
+
+
+async def get_user_stats(user_id: ObjectId, days: int = 30, weeks: int = 12) -> MeasurementStats:
+    """
+    Read the precomputed statistics of a user
+    :param user_id: owner of the measurements
+    :param days: number of most recent daily buckets
+    :param weeks: number of most recent weekly buckets
+    :return: overall statistics and the latest buckets, newest first
+    """
+    await _ensure_stats(user_id)
+    overall = await stats_collection.find_one(_bucket_filter(user_id, ALL_PERIOD, ALL_PERIOD))
+
+    async def latest(period: str, limit: int) -> List[StatsBucket]:
+        if limit <= 0:
+            return []
+        cursor = stats_collection.find({"user_id": user_id, "period": period}).sort("key", -1).limit(limit)
+        return [_to_bucket(document) async for document in cursor]
+
+    overall = overall or {"key": ALL_PERIOD}
+    return MeasurementStats(
+        count=overall.get("count", 0),
+        **{field: _field_stats(overall.get(field)) for field in STATS_FIELDS},
+        daily=await latest(DAY_PERIOD, days),
+        weekly=await latest(WEEK_PERIOD, weeks)
+    )
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from app.core.config import settings
+from app.domain.models.measurement_trends_model import MeasurementTrends, TrendPoint
+from app.infrastructure.database.mongo_database import results_collection
+from app.infrastructure.services.measurement_service import measurement_filter
+
+# Formato de $dateToString de cada periodo (semana ISO igual que en las estadísticas)
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "week": "%G-W%V"}
+
+# Inicio de cada periodo; las semanas ISO empiezan en lunes
+PERIOD_BUCKETS = {
+    "day": {"unit": "day"},
+    "week": {"unit": "week", "startOfWeek": "monday"}
+}
+
+READINGS = {"systolic": "$result.high_pressure", "diastolic": "$result.low_pressure", "pulse": "$result.pulse"}
+
+
+def _count_if(condition: dict) -> dict:
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def trends_pipeline(match: dict, period: str, window: int) -> List[dict]:
+    """
+    Aggregation that groups a user's measurements by period and computes averages,
+    moving averages and out-of-range counts inside MongoDB
+    :param match: filter of the measurements to aggregate
+    :param period: "day" or "week"
+    :param window: length in periods of the moving averages; periods without
+                   measurements count towards it but add nothing to the average
+    :return: aggregation pipeline
+    """
+    systolic, diastolic, pulse = READINGS["systolic"], READINGS["diastolic"], READINGS["pulse"]
+    return [
+        # Solo lecturas numéricas: los documentos sin migrar compararían mal con los umbrales
+        {"$match": {**match, "result.high_pressure": {"$type": "number"}}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$timestamp", **PERIOD_BUCKETS[period]}},
+            "count": {"$sum": 1},
+            **{f"{name}_avg": {"$avg": field} for name, field in READINGS.items()},
+            "high_count": _count_if({"$or": [
+                {"$gte": [systolic, settings.SYSTOLIC_HIGH]}, {"$gte": [diastolic, settings.DIASTOLIC_HIGH]}
+            ]}),
+            "low_count": _count_if({"$or": [
+                {"$lt": [systolic, settings.SYSTOLIC_LOW]}, {"$lt": [diastolic, settings.DIASTOLIC_LOW]}
+            ]}),
+            "pulse_out_of_range": _count_if({"$or": [
+                {"$gt": [pulse, settings.PULSE_HIGH]}, {"$lt": [pulse, settings.PULSE_LOW]}
+            ]})
+        }},
+        # Media móvil sobre los últimos `window` periodos de calendario, tengan datos o no (MongoDB 5.0+)
+        {"$setWindowFields": {
+            "sortBy": {"_id": 1},
+            "output": {
+                f"{name}_moving_avg": {
+                    "$avg": f"${name}_avg",
+                    "window": {"range": [-(window - 1), 0], "unit": PERIOD_BUCKETS[period]["unit"]}
+                }
+                for name in READINGS
+            }
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "key": {"$dateToString": {"format": PERIOD_FORMATS[period], "date": "$_id"}},
+            "count": 1,
+            "high_count": 1,
+            "low_count": 1,
+            "pulse_out_of_range": 1,
+            **{f"{name}_avg": {"$round": [f"${name}_avg", 1]} for name in READINGS},
+            **{f"{name}_moving_avg": {"$round": [f"${name}_moving_avg", 1]} for name in READINGS}
+        }}
+    ]
+
+
+async def get_user_trends(user_id: ObjectId, period: str = "day", window: int = 7,
+                          date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> MeasurementTrends:
+    """
+    Aggregated trend series of a user, computed by MongoDB
+    :param user_id: owner of the measurements
+    :param period: "day" or "week"
+    :param window: number of periods of the moving averages
+    :param date_from: only measurements taken at or after this time
+    :param date_to: only measurements taken at or before this time
+    :return: one point per period with data, oldest first, and the totals of the window
+    """
+    pipeline = trends_pipeline(measurement_filter(user_id, date_from, date_to), period, window)
+    points = [TrendPoint(**point) async for point in results_collection.aggregate(pipeline)]
+
+    return MeasurementTrends(
+        period=period,
+        window=window,
+        count=sum(point.count for point in points),
+        high_count=sum(point.high_count for point in points),
+        low_count=sum(point.low_count for point in points),
+        pulse_out_of_range=sum(point.pulse_out_of_range for point in points),
+        points=points
+    )
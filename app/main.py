@@ -1,17 +1,52 @@
+import asyncio, logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.routes.ocr_routes import router as ocr_router
 from app.api.routes.chatbot_routes import router as chatbot_router
 from app.api.routes.auth_routes import router as auth_router
+from app.api.routes.health_routes import router as health_router
+from app.api.routes.model_routes import router as model_router
+from app.api.routes.job_routes import router as job_router
+from app.core.config import settings
+from app.infrastructure.database.mongo_database import ensure_indexes
+from app.infrastructure.services.model_registry import model_registry
+from app.infrastructure.services.report_service import report_service
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
+
+async def create_indexes():
+    # En segundo plano: sin Mongo o con índices construyéndose la API arranca igual
+    try:
+        await ensure_indexes()
+        logger.info("Database indexes ready")
+    except Exception as e:
+        logger.error(f"Failed to create database indexes: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    indexes = asyncio.create_task(create_indexes())
+    await model_registry.start(warm_up=settings.MODEL_WARMUP_ENABLED)
+    yield
+    indexes.cancel()
+    await model_registry.stop()
+    report_service.shutdown()
+
+
 app = FastAPI(
     title="Number Recognition API",
-    description="API para reconocimiento de números en imágenes"
+    description="API para reconocimiento de números en imágenes",
+    lifespan=lifespan
 )
 
 app.include_router(ocr_router)
+app.include_router(job_router)
 app.include_router(chatbot_router)
 app.include_router(auth_router)
+app.include_router(health_router)
+app.include_router(model_router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,54 @@
+import io, os, zipfile
+from typing import List, Optional, Tuple
+
+# Extensions accepted inside zip archives
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed", "application/x-zip"}
+
+
+class BatchUploadError(ValueError):
+    """Raised when a batch upload cannot be accepted as a whole."""
+
+
+def is_zip_upload(filename: str, content_type: str) -> bool:
+    return content_type in ZIP_CONTENT_TYPES or (filename or "").lower().endswith(".zip")
+
+
+def extract_zip_images(data: bytes, max_image_bytes: int, max_images: Optional[int] = None,
+                       max_total_bytes: Optional[int] = None) -> List[Tuple[str, bytes]]:
+    """
+    Read the images stored in a zip archive
+    :param data: raw bytes of the archive
+    :param max_image_bytes: maximum uncompressed size of a single image
+    :param max_images: maximum number of images the archive may contain
+    :param max_total_bytes: maximum uncompressed size of all the images together
+    :return: (filename, bytes) of every image, in archive order
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise BatchUploadError("Uploaded archive is not a valid zip file")
+
+    images = []
+    total_bytes = 0
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            # Directorios, metadatos de macOS y ficheros que no son imágenes
+            if info.is_dir() or info.filename.startswith("__MACOSX/") or name.startswith("."):
+                continue
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+
+            # Límites comprobados con el tamaño declarado antes de descomprimir, para no inflar
+            # zips maliciosos; zipfile nunca devuelve más bytes que los declarados
+            if max_images is not None and len(images) >= max_images:
+                raise BatchUploadError(f"A batch can contain at most {max_images} images")
+            if info.file_size > max_image_bytes:
+                raise BatchUploadError(f"Image '{info.filename}' exceeds the maximum size per image")
+            total_bytes += info.file_size
+            if max_total_bytes is not None and total_bytes > max_total_bytes:
+                raise BatchUploadError("Batch exceeds the maximum total size")
+            images.append((info.filename, archive.read(info)))
+    return images
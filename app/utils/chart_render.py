@@ -0,0 +1,186 @@
+import base64
+from html import escape
+from io import BytesIO
+from typing import List, Optional, Sequence
+
+CHART_BACKENDS = ("svg", "matplotlib", "plotly")
+
+CHART_TITLE = "Evolución de Mediciones"
+SYSTOLIC_COLOR = "rgb(255, 99, 132)"
+DIASTOLIC_COLOR = "rgb(54, 162, 235)"
+PULSE_COLOR = "rgb(255, 206, 86)"
+
+# Tamaño del gráfico en píxeles (SVG) / puntos
+CHART_WIDTH, CHART_HEIGHT = 900, 380
+MAX_X_LABELS = 10
+
+
+class Chart:
+    def __init__(self, mime_type: str, data: bytes):
+        self.mime_type = mime_type
+        self.data = data
+
+    @property
+    def data_uri(self) -> str:
+        return f"data:{self.mime_type};base64," + base64.b64encode(self.data).decode("ascii")
+
+    def img_tag(self) -> str:
+        return f'<img src="{self.data_uri}" alt="{CHART_TITLE}" width="{CHART_WIDTH}" height="{CHART_HEIGHT}"/>'
+
+    def html(self) -> str:
+        # El SVG se incrusta tal cual en la página; las imágenes rasterizadas como data URI
+        if self.mime_type == "image/svg+xml":
+            return self.data.decode("utf-8")
+        return self.img_tag()
+
+
+def _number(value) -> Optional[float]:
+    # Lecturas numéricas o, en documentos sin migrar, cadenas de dígitos
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str) and value.isdigit():
+        return float(value)
+    return None
+
+
+def _axis_step(max_value: float) -> int:
+    for step in (5, 10, 20, 25, 50, 100, 200, 500):
+        if max_value / step <= 8:
+            return step
+    return 1000
+
+
+def render_svg_chart(fechas: Sequence[str], sistolica: Sequence, diastolica: Sequence, pulsaciones: Sequence) -> bytes:
+    """
+    Grouped bars for the blood pressure and a line for the pulse, drawn directly as SVG
+    :return: SVG document bytes
+    """
+    left, right, top, bottom = 50, 20, 60, 40
+    plot_width = CHART_WIDTH - left - right
+    plot_height = CHART_HEIGHT - top - bottom
+    series = [[_number(v) for v in values] for values in (sistolica, diastolica, pulsaciones)]
+
+    max_value = max([v for values in series for v in values if v is not None] or [1])
+    step = _axis_step(max_value)
+    y_max = step * (int(max_value // step) + 1)
+
+    def y(value: float) -> float:
+        return top + plot_height - value / y_max * plot_height
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{CHART_HEIGHT}" '
+        f'viewBox="0 0 {CHART_WIDTH} {CHART_HEIGHT}" font-family="Arial, sans-serif">',
+        f'<rect x="0" y="0" width="{CHART_WIDTH}" height="{CHART_HEIGHT}" fill="#ffffff"/>',
+        f'<text x="{CHART_WIDTH / 2}" y="24" font-size="16" text-anchor="middle" fill="#333333">{CHART_TITLE}</text>'
+    ]
+
+    # Eje Y y líneas de referencia
+    for tick in range(0, y_max + 1, step):
+        ty = y(tick)
+        parts.append(f'<line x1="{left}" y1="{ty:.1f}" x2="{left + plot_width}" y2="{ty:.1f}" stroke="#e5e5e5" stroke-width="1"/>')
+        parts.append(f'<text x="{left - 6}" y="{ty + 4:.1f}" font-size="10" text-anchor="end" fill="#555555">{tick}</text>')
+
+    count = len(fechas)
+    slot = plot_width / max(count, 1)
+    bar_width = slot * 0.4
+    label_every = max(1, -(-count // MAX_X_LABELS))
+    pulse_points: List[str] = []
+
+    for idx, fecha in enumerate(fechas):
+        x = left + idx * slot
+        for offset, values, color in ((0.1, series[0], SYSTOLIC_COLOR), (0.5, series[1], DIASTOLIC_COLOR)):
+            value = values[idx] if idx < len(values) else None
+            if value is not None:
+                parts.append(f'<rect x="{x + slot * offset:.2f}" y="{y(value):.2f}" width="{bar_width:.2f}" '
+                             f'height="{top + plot_height - y(value):.2f}" fill="{color}"/>')
+        pulse = series[2][idx] if idx < len(series[2]) else None
+        if pulse is not None:
+            pulse_points.append(f"{x + slot / 2:.2f},{y(pulse):.2f}")
+        if idx % label_every == 0:
+            parts.append(f'<text x="{x + slot / 2:.1f}" y="{top + plot_height + 16}" font-size="10" '
+                         f'text-anchor="middle" fill="#555555">{escape(str(fecha))}</text>')
+
+    if pulse_points:
+        parts.append(f'<polyline points="{" ".join(pulse_points)}" fill="none" stroke="{PULSE_COLOR}" stroke-width="2"/>')
+        if count <= 100:
+            for point in pulse_points:
+                cx, cy = point.split(",")
+                parts.append(f'<circle cx="{cx}" cy="{cy}" r="3" fill="{PULSE_COLOR}"/>')
+
+    parts.append(f'<line x1="{left}" y1="{top + plot_height}" x2="{left + plot_width}" y2="{top + plot_height}" stroke="#999999" stroke-width="1"/>')
+
+    # Leyenda
+    for idx, (name, color) in enumerate((("Presión Sistólica", SYSTOLIC_COLOR), ("Presión Diastólica", DIASTOLIC_COLOR), ("Pulso", PULSE_COLOR))):
+        lx = left + idx * 170
+        parts.append(f'<rect x="{lx}" y="38" width="12" height="12" fill="{color}"/>')
+        parts.append(f'<text x="{lx + 18}" y="48" font-size="12" fill="#333333">{name}</text>')
+
+    parts.append("</svg>")
+    return "".join(parts).encode("utf-8")
+
+
+def render_matplotlib_chart(fechas: Sequence[str], sistolica: Sequence, diastolica: Sequence, pulsaciones: Sequence) -> bytes:
+    """
+    Same chart rendered with matplotlib's Agg backend into memory
+    :return: PNG bytes
+    """
+    # Figure sin pyplot: no hay estado global ni backend interactivo
+    from matplotlib.figure import Figure
+
+    dpi = 100
+    fig = Figure(figsize=(CHART_WIDTH / dpi, CHART_HEIGHT / dpi), dpi=dpi)
+    ax = fig.add_subplot()
+    positions = range(len(fechas))
+    series = [[_number(v) or 0 for v in values] for values in (sistolica, diastolica)]
+    ax.bar([p - 0.2 for p in positions], series[0], width=0.4, label="Presión Sistólica", color=(1, 0.388, 0.518))
+    ax.bar([p + 0.2 for p in positions], series[1], width=0.4, label="Presión Diastólica", color=(0.212, 0.635, 0.922))
+    ax.plot(list(positions), [_number(v) for v in pulsaciones], marker="o", label="Pulso", color=(1, 0.808, 0.337))
+
+    label_every = max(1, -(-len(fechas) // MAX_X_LABELS))
+    ax.set_xticks(list(positions)[::label_every])
+    ax.set_xticklabels(list(fechas)[::label_every], fontsize=8)
+    ax.set_title(CHART_TITLE)
+    ax.set_xlabel("Fecha")
+    ax.set_ylabel("Valor")
+    ax.legend(loc="upper left", fontsize=8)
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getbuffer().tobytes()
+
+
+def render_plotly_chart(fechas: Sequence[str], sistolica: Sequence, diastolica: Sequence, pulsaciones: Sequence) -> bytes:
+    """
+    Legacy Plotly chart exported through Kaleido, kept in memory instead of a shared file
+    :return: PNG bytes
+    """
+    import plotly.graph_objects as go
+
+    data = [
+        go.Bar(x=fechas, y=sistolica, name='Presión Sistólica', marker=dict(color=SYSTOLIC_COLOR)),
+        go.Bar(x=fechas, y=diastolica, name='Presión Diastólica', marker=dict(color=DIASTOLIC_COLOR)),
+        go.Scatter(x=fechas, y=pulsaciones, mode='lines+markers', name='Pulso', line=dict(color=PULSE_COLOR))
+    ]
+    layout = go.Layout(title=CHART_TITLE, xaxis=dict(title='Fecha'), yaxis=dict(title='Valor'), barmode='group')
+    return go.Figure(data=data, layout=layout).to_image(format="png", width=CHART_WIDTH, height=CHART_HEIGHT)
+
+
+def render_chart(fechas: Sequence[str], sistolica: Sequence, diastolica: Sequence, pulsaciones: Sequence,
+                 backend: str = "svg") -> Chart:
+    """
+    Render the measurements chart in memory
+    :param fechas: x axis labels
+    :param sistolica: systolic readings
+    :param diastolica: diastolic readings
+    :param pulsaciones: pulse readings
+    :param backend: one of CHART_BACKENDS
+    :return: the chart image
+    """
+    if backend == "svg":
+        return Chart("image/svg+xml", render_svg_chart(fechas, sistolica, diastolica, pulsaciones))
+    if backend == "matplotlib":
+        return Chart("image/png", render_matplotlib_chart(fechas, sistolica, diastolica, pulsaciones))
+    if backend == "plotly":
+        return Chart("image/png", render_plotly_chart(fechas, sistolica, diastolica, pulsaciones))
+    raise ValueError(f"Unknown chart backend '{backend}', expected one of {', '.join(CHART_BACKENDS)}")
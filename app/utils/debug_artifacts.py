@@ -0,0 +1,103 @@
+import logging, os, threading, uuid
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DebugArtifactSession:
+    """Debug images of a single request, stored in their own subfolder."""
+
+    def __init__(self, writer: "DebugArtifactWriter", session_id: str):
+        self.writer = writer
+        self.session_id = session_id
+
+    def save_image(self, name: str, image: np.ndarray):
+        self.writer.save_image(self.session_id, name, image)
+
+
+class DebugArtifactWriter:
+    """
+    Writes intermediate recognition images for debugging. Disabled by default;
+    when enabled, encoding and disk writes happen on a background thread and
+    stop once the directory reaches the configured size cap.
+    """
+
+    def __init__(self, enabled: bool = False, base_dir: str = "debug_artifacts", max_bytes: int = 200 * 1024 * 1024):
+        self.enabled = enabled
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._used_bytes = 0
+        self._cap_reached = False
+
+        if enabled:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-artifacts")
+            self._used_bytes = self._directory_size(base_dir)
+            logger.info(f"Debug artifacts enabled in {os.path.abspath(base_dir)}")
+
+    @classmethod
+    def from_settings(cls) -> "DebugArtifactWriter":
+        return cls(
+            enabled=settings.DEBUG_ARTIFACTS_ENABLED,
+            base_dir=settings.DEBUG_ARTIFACTS_DIR,
+            max_bytes=settings.DEBUG_ARTIFACTS_MAX_MB * 1024 * 1024
+        )
+
+    def new_session(self) -> Optional[DebugArtifactSession]:
+        """
+        Start a new per-request artifact folder
+        :return: the session, or None when debug artifacts are disabled
+        """
+        if not self.enabled:
+            return None
+        session_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        return DebugArtifactSession(self, session_id)
+
+    def save_image(self, session_id: str, name: str, image: np.ndarray):
+        if not self.enabled or self._cap_reached:
+            return
+        # Copy now: the caller may keep working on the same buffer
+        self._executor.submit(self._write_image, session_id, name, image.copy())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _write_image(self, session_id: str, name: str, image: np.ndarray):
+        try:
+            ok, encoded = cv2.imencode(os.path.splitext(name)[1] or ".png", image)
+            if not ok:
+                logger.warning(f"Could not encode debug artifact {name}")
+                return
+
+            with self._lock:
+                if self._used_bytes + encoded.nbytes > self.max_bytes:
+                    if not self._cap_reached:
+                        logger.warning(f"Debug artifact size cap of {self.max_bytes} bytes reached, no more artifacts will be written")
+                    self._cap_reached = True
+                    return
+                self._used_bytes += encoded.nbytes
+
+            session_dir = os.path.join(self.base_dir, session_id)
+            os.makedirs(session_dir, exist_ok=True)
+            with open(os.path.join(session_dir, name), "wb") as f:
+                f.write(encoded.tobytes())
+        except Exception as e:
+            logger.error(f"Failed to write debug artifact {name}: {str(e)}")
+
+    @staticmethod
+    def _directory_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for file_name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file_name))
+                except OSError:
+                    pass
+        return total
@@ -0,0 +1,97 @@
+"""
+Accuracy vs. speed comparison of full-resolution and downscaled display detection.
+
+Usage:
+    python -m app.utils.detection_benchmark <images_dir> [--max-edge 1024] [--max-edge 768]
+"""
+import argparse, os, time
+import cv2
+from typing import Optional, Tuple
+from app.infrastructure.services.image_processor_service import ImageProcessorService
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def _box_iou(a: Optional[Tuple[int, int, int, int]], b: Optional[Tuple[int, int, int, int]]) -> float:
+    if a is None or b is None:
+        return 1.0 if a is None and b is None else 0.0
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def _detect(processor: ImageProcessorService, image) -> Tuple[Optional[Tuple[int, int, int, int]], float]:
+    start = time.perf_counter()
+    contour = processor.detect_display_contour(image)
+    elapsed = time.perf_counter() - start
+    return (cv2.boundingRect(contour) if contour is not None else None), elapsed
+
+
+def run(images_dir: str, max_edges: list):
+    paths = sorted(
+        os.path.join(images_dir, name) for name in os.listdir(images_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not paths:
+        print(f"No images found in {images_dir}")
+        return
+
+    reference = ImageProcessorService(detection_max_edge=0)
+    candidates = {edge: ImageProcessorService(detection_max_edge=edge) for edge in max_edges}
+
+    totals = {edge: {"time": 0.0, "iou": 0.0, "agree": 0} for edge in max_edges}
+    reference_time = 0.0
+    count = 0
+    skipped = []
+
+    print(f"{'image':<32} {'size':>11} {'full ms':>9} " + " ".join(f"{f'{e}px ms':>10} {'IoU':>6}" for e in max_edges))
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            skipped.append(os.path.basename(path))
+            continue
+        count += 1
+
+        ref_box, ref_time = _detect(reference, image)
+        reference_time += ref_time
+
+        columns = []
+        for edge, processor in candidates.items():
+            box, elapsed = _detect(processor, image)
+            iou = _box_iou(ref_box, box)
+            totals[edge]["time"] += elapsed
+            totals[edge]["iou"] += iou
+            totals[edge]["agree"] += int(iou >= 0.9)
+            columns.append(f"{elapsed * 1000:>10.1f} {iou:>6.3f}")
+
+        size = f"{image.shape[1]}x{image.shape[0]}"
+        print(f"{os.path.basename(path)[:32]:<32} {size:>11} {ref_time * 1000:>9.1f} " + " ".join(columns))
+
+    print()
+    if skipped:
+        print(f"Skipped {len(skipped)} unreadable images: {', '.join(skipped)}")
+    if not count:
+        print("No image could be decoded")
+        return
+    print(f"Processed {count} images")
+    print(f"Full resolution: {reference_time / count * 1000:.1f} ms/image")
+    for edge, total in totals.items():
+        print(
+            f"Long edge {edge}px: {total['time'] / count * 1000:.1f} ms/image, "
+            f"speed-up x{reference_time / total['time'] if total['time'] else float('inf'):.1f}, "
+            f"mean IoU {total['iou'] / count:.3f}, "
+            f"{total['agree']}/{count} detections with IoU >= 0.9"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images_dir", help="Directory with sample tensiometer photos")
+    parser.add_argument("--max-edge", type=int, action="append", dest="max_edges",
+                        help="Long edge used for downscaled detection (repeatable)")
+    args = parser.parse_args()
+    run(args.images_dir, args.max_edges or [1024])
@@ -0,0 +1,94 @@
+"""
+Export the Keras digit classifier to the .npz format used by NumpyNumberRecognizer
+and check that both backends produce the same outputs.
+
+Usage:
+    python -m app.utils.export_numpy_model <model.keras> [<model.npz>] [--images <crops_dir>]
+"""
+import argparse, json, os, sys
+import numpy as np
+from typing import Optional
+from app.infrastructure.services.digit_preprocessor import DIGIT_SIZE, preprocess_batch
+
+# Maximum absolute difference allowed between Keras and NumPy probabilities
+PARITY_TOLERANCE = 1e-4
+
+
+def export_model(keras_path: str, npz_path: str):
+    """
+    Write the layer configurations and weights of a Keras model to a .npz file
+    :param keras_path: path of the .keras model
+    :param npz_path: path of the .npz file to create
+    """
+    from tensorflow.keras.models import load_model
+
+    model = load_model(keras_path)
+    layers, arrays = [], {}
+    for i, layer in enumerate(model.layers):
+        names = []
+        for j, weight in enumerate(layer.get_weights()):
+            name = f"layer{i}_w{j}"
+            arrays[name] = weight
+            names.append(name)
+        layers.append({"class_name": layer.__class__.__name__, "config": layer.get_config(), "weights": names})
+
+    metadata = {
+        "format": 1,
+        "source": os.path.basename(keras_path),
+        "input_shape": list(model.input_shape[1:])
+    }
+    # default=str keeps exotic config values (dtype policies, initializers) serializable
+    np.savez(
+        npz_path,
+        __layers__=np.array(json.dumps(layers, default=str)),
+        __meta__=np.array(json.dumps(metadata)),
+        **arrays
+    )
+    print(f"Exported {len(layers)} layers to {npz_path}")
+
+
+def check_parity(keras_path: str, npz_path: str, images_dir: Optional[str] = None, samples: int = 512) -> bool:
+    """
+    Compare Keras and NumPy outputs on random binary digits and, optionally, real crops
+    :param keras_path: path of the .keras model
+    :param npz_path: path of the exported .npz model
+    :param images_dir: optional directory of digit crops
+    :param samples: number of random inputs
+    :return: True if the outputs match within PARITY_TOLERANCE
+    """
+    from tensorflow.keras.models import load_model
+    from app.infrastructure.services.numpy_number_recognizer import NumpyNumberRecognizer
+
+    keras_model = load_model(keras_path)
+    numpy_model = NumpyNumberRecognizer(npz_path)
+
+    # Preprocessed digits are binary images with values 0 or 120
+    rng = np.random.default_rng(0)
+    batch = (rng.random((samples, DIGIT_SIZE, DIGIT_SIZE, 1)) > 0.5).astype(np.uint8) * 120
+
+    if images_dir:
+        import cv2
+        crops = [cv2.imread(os.path.join(images_dir, name)) for name in sorted(os.listdir(images_dir))]
+        crops = [crop for crop in crops if crop is not None]
+        if crops:
+            batch = np.concatenate([batch, preprocess_batch(crops)])
+
+    expected = keras_model.predict(batch, verbose=0)
+    actual = numpy_model.forward(batch)
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    print(f"Parity on {len(batch)} inputs: max |diff| = {max_diff:.2e}, argmax agreement = {agreement:.2%}")
+    return max_diff <= PARITY_TOLERANCE and agreement == 1.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("keras_path", help="Keras model to export")
+    parser.add_argument("npz_path", nargs="?", help="Output file (defaults to the model path with .npz)")
+    parser.add_argument("--images", help="Directory of digit crops to include in the parity check")
+    args = parser.parse_args()
+
+    output = args.npz_path or os.path.splitext(args.keras_path)[0] + ".npz"
+    export_model(args.keras_path, output)
+    sys.exit(0 if check_parity(args.keras_path, output, args.images) else 1)
@@ -1,39 +1,20 @@
-import os
+import asyncio
 from datetime import datetime
-from pygments.lexers import go
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+from app.core.config import settings
+from app.utils.chart_render import render_chart
 
-def render_measurements_html(measurements: list) -> str:
-    fechas = []
-    sistolica = []
-    diastolica = []
-    pulsaciones = []
-    table_rows_html = ""
+PLOTLY_SCRIPT = '<script src="https://cdn.plot.ly/plotly-latest.min.js"></script>'
 
-    for measure in measurements:
-        fecha = measure["timestamp"].strftime('%d-%m-%Y') if hasattr(measure["timestamp"], 'strftime') else str(measure["timestamp"])
-        high_pressure = measure["result"]["high_pressure"]
-        low_pressure = measure["result"]["low_pressure"]
-        pulse = measure["result"]["pulse"]
-
-        fechas.append(fecha)
-        sistolica.append(high_pressure)
-        diastolica.append(low_pressure)
-        pulsaciones.append(pulse)
+# Filas por fragmento enviado al cliente
+ROWS_PER_CHUNK = 200
 
-        table_rows_html += f"""
-            <tr>
-                <td>{high_pressure}</td>
-                <td>{low_pressure}</td>
-                <td>{pulse}</td>
-                <td>{fecha}</td>
-            </tr>
-        """
-
-    return f"""
+# Plantillas construidas una vez al importar el módulo; en cada informe solo se rellenan los huecos
+HEAD_TEMPLATE = """
     <html>
     <head>
         <title>Informe de Mediciones</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        {head_script}
         <style>
             body {{
                 font-family: 'Arial', sans-serif;
@@ -82,7 +63,7 @@ def render_measurements_html(measurements: list) -> str:
     </head>
     <body>
         <h1>Informe de Mediciones</h1>
-        <h2>Fecha de generación: {datetime.now().strftime('%d-%m-%Y')}</h2>
+        <h2>Fecha de generación: {generated_at}</h2>
 
         <div style="text-align: center; margin-top: 30px;">
             <a href="/ocr/user/measurements/pdf" class="btn-download" target="_blank">
@@ -101,11 +82,29 @@ def render_measurements_html(measurements: list) -> str:
                     </tr>
                 </thead>
                 <tbody>
-                    {table_rows_html}
+"""
+
+ROW_TEMPLATE = """
+            <tr>
+                <td>{}</td>
+                <td>{}</td>
+                <td>{}</td>
+                <td>{}</td>
+            </tr>"""
+
+TABLE_END = """
                 </tbody>
             </table>
         </div>
+"""
 
+TAIL_TEMPLATE = """
+        {chart_html}
+    </body>
+    </html>
+    """
+
+PLOTLY_CHART_TEMPLATE = """
         <div id="grafico" style="margin-top: 50px;"></div>
 
         <script>
@@ -149,33 +148,102 @@ def render_measurements_html(measurements: list) -> str:
 
             Plotly.newPlot('grafico', data, layout);
         </script>
-    </body>
-    </html>
     """
 
+_render_head = HEAD_TEMPLATE.format
+_render_row = ROW_TEMPLATE.format
+_render_tail = TAIL_TEMPLATE.format
+_render_plotly_chart = PLOTLY_CHART_TEMPLATE.format
 
-def generate_static_plot(fechas, sistolica, diastolica, pulsaciones):
-    trace1 = go.Bar(x=fechas, y=sistolica, name='Presión Sistólica', marker=dict(color='rgb(255, 99, 132)'))
-    trace2 = go.Bar(x=fechas, y=diastolica, name='Presión Diastólica', marker=dict(color='rgb(54, 162, 235)'))
-    trace3 = go.Scatter(x=fechas, y=pulsaciones, mode='lines+markers', name='Pulso',
-                        line=dict(color='rgb(255, 206, 86)'))
-
-    data = [trace1, trace2, trace3]
-
-    layout = go.Layout(
-        title='Evolución de Mediciones',
-        xaxis=dict(title='Fecha'),
-        yaxis=dict(title='Valor'),
-        barmode='group'
-    )
 
-    fig = go.Figure(data=data, layout=layout)
+class MeasurementsHtmlRenderer:
+    """
+    Renders the measurements report piece by piece: head(), rows() for each group of
+    measurements and tail(). The chart goes after the table, so only the plotted
+    series are kept while the rows are written out.
+    """
 
-    img_dir = "static/images"
-    if not os.path.exists(img_dir):
-        os.makedirs(img_dir)
+    def __init__(self, for_pdf: bool = False, chart_backend: Optional[str] = None):
+        self.for_pdf = for_pdf
+        self.chart_backend = chart_backend or settings.CHART_BACKEND
+        self.fechas: List[str] = []
+        self.sistolica: List = []
+        self.diastolica: List = []
+        self.pulsaciones: List = []
+
+    def head(self) -> str:
+        # Gráfico interactivo en el navegador solo con el backend plotly
+        head_script = PLOTLY_SCRIPT if self.chart_backend == "plotly" and not self.for_pdf else ""
+        return _render_head(head_script=head_script, generated_at=datetime.now().strftime('%d-%m-%Y'))
+
+    def rows(self, measurements: Iterable[dict]) -> str:
+        rendered = []
+        for measure in measurements:
+            timestamp = measure["timestamp"]
+            fecha = timestamp.strftime('%d-%m-%Y') if hasattr(timestamp, 'strftime') else str(timestamp)
+            result = measure["result"]
+            high_pressure, low_pressure, pulse = result["high_pressure"], result["low_pressure"], result["pulse"]
+
+            self.fechas.append(fecha)
+            self.sistolica.append(high_pressure)
+            self.diastolica.append(low_pressure)
+            self.pulsaciones.append(pulse)
+            rendered.append(_render_row(high_pressure, low_pressure, pulse, fecha))
+        return "".join(rendered)
+
+    def tail(self) -> str:
+        return TABLE_END + _render_tail(chart_html=self._chart_html())
+
+    def _chart_html(self) -> str:
+        if self.chart_backend == "plotly" and not self.for_pdf:
+            return _render_plotly_chart(
+                fechas=self.fechas, sistolica=self.sistolica, diastolica=self.diastolica, pulsaciones=self.pulsaciones
+            )
+        # Imagen generada en memoria; xhtml2pdf solo admite el gráfico como <img>
+        chart = render_chart(self.fechas, self.sistolica, self.diastolica, self.pulsaciones, self.chart_backend)
+        return f'<div id="grafico" style="margin-top: 50px; text-align: center;">{chart.img_tag() if self.for_pdf else chart.html()}</div>'
+
+
+def iter_measurements_html(measurements: Iterable[dict], for_pdf: bool = False,
+                           chart_backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Render the report as a sequence of HTML chunks
+    :param measurements: projected measurement documents, oldest first
+    :param for_pdf: embed the chart as an image for xhtml2pdf
+    :param chart_backend: one of CHART_BACKENDS, settings.CHART_BACKEND by default
+    :return: iterator of HTML fragments
+    """
+    renderer = MeasurementsHtmlRenderer(for_pdf, chart_backend)
+    yield renderer.head()
+    batch = []
+    for measure in measurements:
+        batch.append(measure)
+        if len(batch) == ROWS_PER_CHUNK:
+            yield renderer.rows(batch)
+            batch = []
+    if batch:
+        yield renderer.rows(batch)
+    yield renderer.tail()
 
-    img_path = os.path.join(img_dir, "grafico.png")
-    fig.write_image(img_path)
 
-    return img_path
\ No newline at end of file
+async def aiter_measurements_html(measurements: AsyncIterable[dict], for_pdf: bool = False,
+                                  chart_backend: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Same as iter_measurements_html, reading the measurements from an async iterator (a database cursor)
+    """
+    renderer = MeasurementsHtmlRenderer(for_pdf, chart_backend)
+    yield renderer.head()
+    batch = []
+    async for measure in measurements:
+        batch.append(measure)
+        if len(batch) == ROWS_PER_CHUNK:
+            yield renderer.rows(batch)
+            batch = []
+    if batch:
+        yield renderer.rows(batch)
+    # El gráfico (matplotlib/plotly) puede tardar: fuera del event loop
+    yield await asyncio.to_thread(renderer.tail)
+
+
+def render_measurements_html(measurements: Iterable[dict], for_pdf: bool = False, chart_backend: Optional[str] = None) -> str:
+    return "".join(iter_measurements_html(measurements, for_pdf, chart_backend))
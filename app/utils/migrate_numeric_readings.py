@@ -0,0 +1,61 @@
+"""
+Convert the readings of measurements stored before the numeric result schema
+("120" -> 120) so they can be range-queried and aggregated in MongoDB.
+Documents already migrated are left untouched, so it can be run several times.
+
+Usage:
+    python -m app.utils.migrate_numeric_readings [--batch-size N] [--dry-run]
+"""
+import argparse, asyncio
+from pymongo import UpdateOne
+from app.infrastructure.database.mongo_database import results_collection
+from app.infrastructure.services.stats_service import parse_reading
+
+READING_FIELDS = ("high_pressure", "low_pressure", "pulse")
+
+
+async def migrate(batch_size: int = 500, dry_run: bool = False) -> int:
+    """
+    Rewrite string readings as integers
+    :param batch_size: documents per bulk write
+    :param dry_run: only count the documents that would change
+    :return: number of documents converted
+    """
+    query = {"$or": [{f"result.{field}": {"$type": "string"}} for field in READING_FIELDS]}
+    projection = {f"result.{field}": 1 for field in READING_FIELDS}
+
+    converted, skipped, operations = 0, 0, []
+    async for document in results_collection.find(query, projection):
+        update = {}
+        for field in READING_FIELDS:
+            value = document.get("result", {}).get(field)
+            if isinstance(value, str):
+                number = parse_reading(value)
+                if number is None:
+                    # Valor no numérico: se deja para revisarlo a mano
+                    skipped += 1
+                    continue
+                update[f"result.{field}"] = number
+        if not update:
+            continue
+
+        converted += 1
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": update}))
+        if len(operations) >= batch_size:
+            if not dry_run:
+                await results_collection.bulk_write(operations, ordered=False)
+            operations = []
+
+    if operations and not dry_run:
+        await results_collection.bulk_write(operations, ordered=False)
+
+    print(f"{'Would convert' if dry_run else 'Converted'} {converted} measurements, {skipped} non-numeric readings left as is")
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many documents would change")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
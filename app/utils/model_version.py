@@ -0,0 +1,16 @@
+import hashlib, os
+
+
+def file_version(model_path: str) -> str:
+    """
+    Version tag of a model file: its name plus a digest of its content, so a
+    retrained model saved under the same file name still gets a new version
+    :param model_path: path of the model file
+    :return: version string such as "tensoscan_model@1a2b3c4d5e6f"
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return f"{name}@{digest.hexdigest()[:12]}"
@@ -0,0 +1,55 @@
+import base64, json
+from datetime import datetime
+from typing import Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+
+SORT_ORDERS = ("asc", "desc")
+
+
+def encode_cursor(timestamp: datetime, document_id: ObjectId) -> str:
+    """
+    Opaque cursor pointing right after a document in (timestamp, _id) order
+    :param timestamp: timestamp of the last document returned
+    :param document_id: _id of the last document returned
+    :return: URL-safe cursor string
+    """
+    payload = json.dumps({"t": timestamp.isoformat(), "id": str(document_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Read a cursor built by encode_cursor
+    :param cursor: cursor string sent by the client
+    :return: (timestamp, _id) of the last document of the previous page
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(cursor: Optional[str], order: str = "asc") -> dict:
+    """
+    Query filter selecting the documents after the cursor
+    :param cursor: cursor of the previous page, None for the first page
+    :param order: "asc" or "desc" on (timestamp, _id)
+    :return: MongoDB filter, empty for the first page
+    """
+    if not cursor:
+        return {}
+    timestamp, document_id = decode_cursor(cursor)
+    op = "$gt" if order == "asc" else "$lt"
+    # Desempate por _id cuando varias mediciones comparten timestamp
+    return {"$or": [
+        {"timestamp": {op: timestamp}},
+        {"timestamp": timestamp, "_id": {op: document_id}}
+    ]}
+
+
+def sort_spec(order: str = "asc") -> list:
+    direction = 1 if order == "asc" else -1
+    return [("timestamp", direction), ("_id", direction)]
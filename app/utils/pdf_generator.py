@@ -1,6 +1,9 @@
+import logging
 from io import BytesIO
 from xhtml2pdf import pisa
 
+logger = logging.getLogger(__name__)
+
 def generate_pdf_from_html(html_content: str) -> BytesIO:
     result = BytesIO()
     pisa_status = pisa.CreatePDF(html_content, dest=result)
@@ -8,11 +11,12 @@ def generate_pdf_from_html(html_content: str) -> BytesIO:
     if pisa_status.err:
         raise Exception(f"Error al generar el PDF: {pisa_status.err}")
 
-    pdf_data = result.getvalue()
-    print(f"Tamaño del PDF generado: {len(pdf_data)} bytes")
+    # El tamaño es la posición actual: sin copiar el PDF con getvalue()
+    pdf_size = result.tell()
+    logger.info(f"Tamaño del PDF generado: {pdf_size} bytes")
 
-    if len(pdf_data) == 0:
+    if pdf_size == 0:
         raise Exception("El PDF generado está vacío")
 
     result.seek(0)
-    return result
\ No newline at end of file
+    return result
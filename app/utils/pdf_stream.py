@@ -0,0 +1,172 @@
+import zlib
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional
+
+# A4 en puntos
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+# Reserved object numbers: the page tree is written last but referenced by every page
+CATALOG_ID, PAGES_ID, FONT_ID, BOLD_FONT_ID = 1, 2, 3, 4
+
+
+def _pdf_text(text: str) -> bytes:
+    # Cadena literal PDF en WinAnsi (Helvetica estándar), con los caracteres especiales escapados
+    encoded = text.encode("cp1252", errors="replace")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class StreamingPdfWriter:
+    """
+    Minimal PDF writer that produces the document as a sequence of byte chunks:
+    begin(), one add_page() per page and finish(). Only the byte offsets of the
+    objects are kept, so memory does not grow with the content of the pages.
+    """
+
+    def __init__(self, title: str = ""):
+        self.title = title
+        self._position = 0
+        self._offsets: Dict[int, int] = {}
+        self._page_ids: List[int] = []
+        self._next_id = BOLD_FONT_ID + 1
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _emit(self, data: bytes) -> bytes:
+        self._position += len(data)
+        return data
+
+    def _object(self, object_id: int, body: bytes) -> bytes:
+        self._offsets[object_id] = self._position
+        return self._emit(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def _new_id(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def begin(self) -> bytes:
+        chunk = self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for object_id, font in ((FONT_ID, b"Helvetica"), (BOLD_FONT_ID, b"Helvetica-Bold")):
+            chunk += self._object(
+                object_id,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /" + font + b" /Encoding /WinAnsiEncoding >>"
+            )
+        return chunk
+
+    def add_page(self, content: bytes) -> bytes:
+        """
+        Write one page
+        :param content: page content stream (PDF drawing operators)
+        :return: bytes to send for this page
+        """
+        content = zlib.compress(content)
+        content_id, page_id = self._new_id(), self._new_id()
+        self._page_ids.append(page_id)
+
+        chunk = self._object(
+            content_id,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream"
+        )
+        chunk += self._object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] " % (PAGES_ID, PAGE_WIDTH, PAGE_HEIGHT)
+            + b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>" % (FONT_ID, BOLD_FONT_ID, content_id)
+        )
+        return chunk
+
+    def finish(self) -> bytes:
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        chunk = self._object(PAGES_ID, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self._page_ids))
+        chunk += self._object(CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID)
+        info_id = self._new_id()
+        chunk += self._object(info_id, b"<< /Title " + _pdf_text(self.title) + b" /Producer (TensoScan) >>")
+
+        xref_offset = self._position
+        size = self._next_id
+        xref = b"xref\n0 %d\n0000000000 65535 f \n" % size
+        xref += b"".join(b"%010d 00000 n \n" % self._offsets[object_id] for object_id in range(1, size))
+        trailer = b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            size, CATALOG_ID, info_id, xref_offset
+        )
+        return chunk + self._emit(xref + trailer)
+
+
+class MeasurementsPdfStream:
+    """
+    Measurements report laid out as a paginated table, produced page by page from
+    an iterator of measurement documents.
+    """
+
+    ROWS_PER_PAGE = 40
+    COLUMNS = (("Sistólica", 70), ("Diastólica", 190), ("Pulso", 310), ("Fecha", 420))
+    ROW_HEIGHT = 17
+
+    def __init__(self, title: str = "Informe de Mediciones", generated_at: Optional[datetime] = None):
+        self.title = title
+        self.generated_at = generated_at or datetime.now()
+        self.writer = StreamingPdfWriter(title)
+
+    def begin(self) -> bytes:
+        return self.writer.begin()
+
+    def page(self, measurements: Iterable[dict]) -> bytes:
+        """
+        Render one page of the table
+        :param measurements: at most ROWS_PER_PAGE projected measurement documents
+        :return: bytes of the page
+        """
+        page_number = self.writer.page_count + 1
+        ops = []
+        y = PAGE_HEIGHT - 60
+        if page_number == 1:
+            ops.append(self._text(self.title, 50, y, size=20, bold=True))
+            y -= 24
+            ops.append(self._text(f"Fecha de generación: {self.generated_at.strftime('%d-%m-%Y')}", 50, y, size=11))
+            y -= 30
+
+        # Cabecera de la tabla
+        ops.append(b"0.298 0.686 0.314 rg 50 %d 495 %d re f 0 g" % (y - 5, self.ROW_HEIGHT))
+        ops.append(b"1 g")
+        ops.extend(self._text(name, x, y, bold=True) for name, x in self.COLUMNS)
+        ops.append(b"0 g")
+        y -= self.ROW_HEIGHT
+
+        for idx, measure in enumerate(measurements):
+            if idx % 2:
+                ops.append(b"0.95 g 50 %d 495 %d re f 0 g" % (y - 5, self.ROW_HEIGHT))
+            timestamp = measure["timestamp"]
+            fecha = timestamp.strftime('%d-%m-%Y %H:%M') if hasattr(timestamp, 'strftime') else str(timestamp)
+            result = measure["result"]
+            values = (result["high_pressure"], result["low_pressure"], result["pulse"], fecha)
+            ops.extend(self._text(str(value), x, y) for value, (_, x) in zip(values, self.COLUMNS))
+            y -= self.ROW_HEIGHT
+
+        ops.append(self._text(f"Página {page_number}", PAGE_WIDTH - 100, 30, size=9))
+        return self.writer.add_page(b"\n".join(ops))
+
+    def finish(self) -> bytes:
+        return self.writer.finish()
+
+    async def stream(self, measurements: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+        """
+        Produce the whole document, one page of rows at a time
+        :param measurements: projected measurement documents, oldest first
+        :return: async iterator of PDF chunks
+        """
+        yield self.begin()
+        rows: List[dict] = []
+        async for measure in measurements:
+            rows.append(measure)
+            if len(rows) == self.ROWS_PER_PAGE:
+                yield self.page(rows)
+                rows = []
+        if rows or not self.writer.page_count:
+            yield self.page(rows)
+        yield self.finish()
+
+    @staticmethod
+    def _text(text: str, x: float, y: float, size: int = 10, bold: bool = False) -> bytes:
+        font = b"F2" if bold else b"F1"
+        return b"BT /" + font + b" %d Tf %d %d Td " % (size, x, y) + _pdf_text(text) + b" Tj ET"
@@ -0,0 +1,26 @@
+"""
+Recompute the per-user measurement statistics from the stored measurements.
+Run it once after deploying the incremental statistics, or to repair them.
+
+Usage:
+    python -m app.utils.rebuild_measurement_stats [<user_id> ...]
+"""
+import argparse, asyncio
+from bson import ObjectId
+from app.infrastructure.database.mongo_database import results_collection
+from app.infrastructure.services.stats_service import rebuild_user_stats
+
+
+async def rebuild(user_ids: list):
+    if not user_ids:
+        user_ids = await results_collection.distinct("user_id")
+    for user_id in user_ids:
+        count = await rebuild_user_stats(user_id)
+        print(f"User {user_id}: {count} measurements")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("user_ids", nargs="*", help="Users to rebuild (defaults to every user with measurements)")
+    args = parser.parse_args()
+    asyncio.run(rebuild([ObjectId(user_id) for user_id in args.user_ids]))
@@ -0,0 +1,97 @@
+"""
+Recognition worker: pulls jobs submitted to /ocr/jobs from the job queue, runs the
+display recognition and stores the results. Run as many processes as needed,
+independently of the API workers.
+
+Usage:
+    python -m app.workers.recognition_worker [--concurrency N] [--worker-id NAME]
+"""
+import argparse, asyncio, logging, os, socket
+from bson import ObjectId
+from app.core.config import settings
+from app.domain.interfaces.job_queue_interface import JobQueueInterface
+from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry
+from app.infrastructure.services.display_recognizer_service import DisplayRecognizerService
+from app.infrastructure.services.image_processor_service import ImageProcessorService
+from app.infrastructure.services.job_queue import create_job_queue
+from app.infrastructure.services.measurement_service import save_measurement
+from app.infrastructure.services.model_registry import MODEL_PATH
+from app.infrastructure.services.predictor_factory import create_predictor, model_path_for
+from app.infrastructure.services.result_cache import RecognitionResultCache
+from app.utils.debug_artifacts import DebugArtifactWriter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_display_service() -> DisplayRecognizerService:
+    model_path = model_path_for(settings.PREDICTOR_BACKEND, MODEL_PATH)
+    return DisplayRecognizerService(
+        create_predictor(settings.PREDICTOR_BACKEND, model_path),
+        ImageProcessorService(),
+        DisplayLayoutRegistry.from_file(settings.DISPLAY_LAYOUTS_PATH),
+        DebugArtifactWriter.from_settings()
+    )
+
+
+async def process_next_job(queue: JobQueueInterface, service: DisplayRecognizerService, worker_id: str) -> bool:
+    """
+    Claim and run one job
+    :param queue: job queue to pull from
+    :param service: display recognition service
+    :param worker_id: name recorded on the claimed job
+    :return: False if the queue had no job waiting
+    """
+    claimed = await queue.claim(worker_id)
+    if claimed is None:
+        return False
+
+    job, image_bytes = claimed
+    logger.info(f"Processing job {job.job_id} ({job.filename}), attempt {job.attempts}")
+    try:
+        result = await asyncio.to_thread(service.recognize_display, image_bytes, job.layout)
+        await save_measurement(ObjectId(job.user_id), job.filename, result, RecognitionResultCache.image_hash(image_bytes))
+    except ValueError as e:
+        # Imagen sin display reconocible o layout desconocido: reintentar no sirve
+        await queue.fail(job.job_id, str(e))
+        return True
+    except Exception as e:
+        logger.error(f"Job {job.job_id} failed: {str(e)}")
+        await queue.fail(job.job_id, "Error processing image", retry=True)
+        return True
+
+    await queue.complete(job.job_id, result)
+    logger.info(f"Job {job.job_id} done")
+    return True
+
+
+async def run_worker(worker_id: str, concurrency: int = 1):
+    queue = create_job_queue()
+    service = await asyncio.to_thread(build_display_service)
+    logger.info(f"Recognition worker {worker_id} started: queue={settings.JOB_QUEUE_BACKEND}, "
+                f"model={service.model.version}, concurrency={concurrency}")
+
+    async def slot():
+        while True:
+            try:
+                busy = await process_next_job(queue, service, worker_id)
+            except Exception as e:
+                # Cola no disponible: esperar y volver a intentar
+                logger.error(f"Job queue error: {str(e)}")
+                busy = False
+            if not busy:
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+
+    await asyncio.gather(*(slot() for _ in range(max(1, concurrency))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs processed at the same time by this process")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="Name recorded on claimed jobs")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_worker(args.worker_id, args.concurrency))
+    except KeyboardInterrupt:
+        logger.info("Recognition worker stopped")
@@ -0,0 +1,95 @@
+import pytest
+from app.infrastructure.services import auth_cache as auth_cache_module
+from app.infrastructure.services.auth_cache import AuthCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # El reloj se sustituye antes de crear la caché: TLRUCache guarda la función timer
+    fake = FakeClock()
+    monkeypatch.setattr(auth_cache_module, "time", fake)
+    return fake
+
+
+def user(user_id: str = "u1") -> dict:
+    return {"_id": user_id, "email": f"{user_id}@example.com"}
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=60)
+    cache.put("token", user(), expires_at=clock.now + 3600)
+
+    clock.now += 59
+    assert cache.get("token") == user()
+    clock.now += 1
+    assert cache.get("token") is None
+
+
+def test_entry_never_outlives_token_expiry(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=300)
+    cache.put("token", user(), expires_at=clock.now + 10)
+
+    clock.now += 9
+    assert cache.get("token") == user()
+    clock.now += 1
+    assert cache.get("token") is None
+
+
+def test_token_without_expiry_uses_ttl(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=30)
+    cache.put("token", user())
+
+    clock.now += 29
+    assert cache.get("token") is not None
+    clock.now += 1
+    assert cache.get("token") is None
+
+
+def test_expired_token_is_not_cached(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=300)
+    cache.put("token", user(), expires_at=clock.now)
+    cache.put("older", user(), expires_at=clock.now - 1)
+
+    assert cache.stats()["size"] == 0
+    assert cache.get("token") is None
+
+
+def test_invalidate_user_drops_all_their_tokens(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=300)
+    cache.put("a", user("u1"), expires_at=clock.now + 100)
+    cache.put("b", user("u1"), expires_at=clock.now + 100)
+    cache.put("c", user("u2"), expires_at=clock.now + 100)
+
+    assert cache.invalidate_user("u1") == 2
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") == user("u2")
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_stats_and_returned_copies(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=300)
+    cache.put("token", user(), expires_at=clock.now + 100)
+
+    cached = cache.get("token")
+    cached["email"] = "changed"
+    assert cache.get("token") == user()
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"], stats["maxsize"]) == (2, 1, 1, 10)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_tokens_are_not_stored_in_clear(clock):
+    cache = AuthCache(maxsize=10, ttl_seconds=300)
+    cache.put("secret-token", user(), expires_at=clock.now + 100)
+    assert "secret-token" not in cache._cache
+    assert AuthCache.token_key("secret-token") in cache._cache
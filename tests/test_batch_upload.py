@@ -0,0 +1,54 @@
+import io, zipfile
+import pytest
+from app.utils.batch_upload import BatchUploadError, extract_zip_images, is_zip_upload
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_extracts_images_in_archive_order_and_skips_other_files():
+    data = make_zip([("a.jpg", b"1"), ("notes.txt", b"x"), ("__MACOSX/._a.jpg", b"x"), ("dir/b.PNG", b"22")])
+    assert extract_zip_images(data, max_image_bytes=10) == [("a.jpg", b"1"), ("dir/b.PNG", b"22")]
+
+
+def test_rejects_invalid_archive():
+    with pytest.raises(BatchUploadError):
+        extract_zip_images(b"not a zip", max_image_bytes=10)
+
+
+def test_rejects_image_over_the_per_image_limit():
+    with pytest.raises(BatchUploadError, match="maximum size per image"):
+        extract_zip_images(make_zip([("a.jpg", b"0" * 11)]), max_image_bytes=10)
+
+
+def test_rejects_too_many_images_before_reading_them():
+    data = make_zip([(f"{idx}.jpg", b"0") for idx in range(5)])
+    assert len(extract_zip_images(data, max_image_bytes=10, max_images=5)) == 5
+    with pytest.raises(BatchUploadError, match="at most 4 images"):
+        extract_zip_images(data, max_image_bytes=10, max_images=4)
+
+
+def test_rejects_archive_over_the_total_size_without_inflating_it(monkeypatch):
+    # Muy comprimible: 3 MB de ceros ocupan unos pocos KB en el zip
+    data = make_zip([(f"{idx}.jpg", b"\0" * 1024 * 1024) for idx in range(3)])
+    assert len(data) < 100 * 1024
+
+    reads = []
+    original_read = zipfile.ZipFile.read
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, name, pwd=None: reads.append(name) or original_read(self, name, pwd))
+
+    with pytest.raises(BatchUploadError, match="maximum total size"):
+        extract_zip_images(data, max_image_bytes=2 * 1024 * 1024, max_total_bytes=2 * 1024 * 1024)
+    # El tercer miembro se rechaza por su tamaño declarado, sin descomprimirlo
+    assert len(reads) == 2
+
+
+def test_zip_uploads_are_detected_by_content_type_or_extension():
+    assert is_zip_upload("batch.ZIP", "application/octet-stream")
+    assert is_zip_upload("batch", "application/zip")
+    assert not is_zip_upload("photo.jpg", "image/jpeg")
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from PIL import Image
+from app.core.config import settings
+from app.infrastructure.services.digit_preprocessor import pil_luma, preprocess_display, preprocess_image
+from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry
+
+LAYOUTS = DisplayLayoutRegistry.from_file(settings.DISPLAY_LAYOUTS_PATH).layouts
+
+
+def legacy_preprocess(display: np.ndarray, layout) -> np.ndarray:
+    # Camino anterior: recorte a recorte, pasando por PIL
+    height, width = display.shape[:2]
+    return np.concatenate([
+        preprocess_image(Image.fromarray(display[rows, cols])) for rows, cols in layout.slices_for((width, height))
+    ])
+
+
+def test_pil_luma_matches_pil_convert():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    expected = np.array(Image.fromarray(image).convert("L"))
+    assert np.array_equal(pil_luma(image), expected)
+
+
+def near_threshold_colors(rng, count: int) -> np.ndarray:
+    # Colores cuyo gris queda en el umbral (78 tras el preprocesado) y cuya luminancia exacta
+    # cae casi en .5: ahí es donde otro redondeo daría un nivel distinto y cambiaría el dígito
+    colors = rng.integers(0, 256, size=(200000, 3), dtype=np.uint8)
+    exact = colors.astype(np.float64) @ np.array([0.299, 0.587, 0.114])
+    luma = pil_luma(colors[None])[0]
+    tie = np.abs(exact - np.floor(exact) - 0.5) < 0.01
+    return colors[tie & (luma >= 79) & (luma <= 80)][:count]
+
+
+@pytest.mark.parametrize("layout", LAYOUTS, ids=lambda layout: layout.name)
+def test_preprocess_display_matches_per_crop_path(layout):
+    rng = np.random.default_rng(13)
+    palette = near_threshold_colors(rng, 64)
+    width, height = layout.frame_size
+    for _ in range(100):
+        display = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        # Regiones de color plano cerca del umbral además del ruido
+        for rows, cols in layout.slices_for((width, height)):
+            if rng.random() < 0.5:
+                display[rows, cols] = palette[rng.integers(len(palette))]
+        assert np.array_equal(preprocess_display(display, layout), legacy_preprocess(display, layout))
+
+
+def test_preprocess_display_accepts_grayscale_and_other_sizes():
+    layout = LAYOUTS[0]
+    rng = np.random.default_rng(7)
+    display = rng.integers(0, 256, size=(151, 203), dtype=np.uint8)
+    assert np.array_equal(preprocess_display(display, layout), legacy_preprocess(display, layout))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from app.core.config import settings
+from app.domain.models.display_layout_model import DisplayLayout
+from app.infrastructure.services.display_layout_registry import DisplayLayoutRegistry, UnknownLayoutError
+from app.infrastructure.services.image_processor_service import ImageProcessorService
+
+
+def make_layout(**overrides) -> DisplayLayout:
+    fields = dict(
+        name="test",
+        frame_size=(200, 100),
+        systolic=[(0.0, 0.0, 0.5, 0.5), (0.5, 0.0, 1.0, 0.5)],
+        diastolic=[(0.0, 0.5, 0.5, 1.0)],
+        pulse=[(0.5, 0.5, 1.0, 1.0)]
+    )
+    fields.update(overrides)
+    return DisplayLayout(**fields)
+
+
+def test_slices_are_normalized_to_the_frame_size():
+    layout = make_layout()
+    assert layout.slices_for((200, 100)) == [
+        (slice(0, 50), slice(0, 100)),
+        (slice(0, 50), slice(100, 200)),
+        (slice(50, 100), slice(0, 100)),
+        (slice(50, 100), slice(100, 200))
+    ]
+
+
+def test_slices_scale_to_other_image_sizes():
+    layout = make_layout()
+    assert layout.slices_for((20, 10))[3] == (slice(5, 10), slice(10, 20))
+    # Redondeo de regiones que no caen en píxeles enteros
+    assert make_layout(pulse=[(0.333, 0.25, 0.667, 0.75)]).slices_for((10, 10))[3] == (slice(2, 8), slice(3, 7))
+
+
+def test_frame_size_slices_are_cached():
+    layout = make_layout()
+    assert layout.slices_for((200, 100)) is layout.slices_for([200, 100])
+
+
+@pytest.mark.parametrize("region", [(0.5, 0.0, 0.5, 1.0), (0.0, 0.6, 1.0, 0.4), (-0.1, 0.0, 0.5, 1.0), (0.0, 0.0, 1.1, 1.0)])
+def test_invalid_regions_are_rejected(region):
+    with pytest.raises(ValidationError):
+        make_layout(pulse=[region])
+
+
+def test_every_reading_needs_a_region():
+    with pytest.raises(ValidationError):
+        make_layout(diastolic=[])
+
+
+def test_split_fields_follows_digit_counts():
+    layout = make_layout()
+    assert layout.digit_counts == (2, 1, 1)
+    assert layout.split_fields([1, 2, 3, 4]) == ([1, 2], [3], [4])
+
+
+def test_bundled_layouts_fit_their_frame():
+    registry = DisplayLayoutRegistry.from_file(settings.DISPLAY_LAYOUTS_PATH)
+    assert registry.default in registry
+    for layout in registry.layouts:
+        width, height = layout.frame_size
+        for rows, cols in layout.slices_for(layout.frame_size):
+            assert 0 <= rows.start < rows.stop <= height
+            assert 0 <= cols.start < cols.stop <= width
+
+
+def test_registry_detects_closest_aspect_ratio():
+    wide = make_layout(name="wide", frame_size=(300, 100))
+    tall = make_layout(name="tall", frame_size=(100, 300))
+    registry = DisplayLayoutRegistry([wide, tall])
+    assert registry.detect(2.5).name == "wide"
+    assert registry.detect(0.4).name == "tall"
+    assert registry.get().name == "wide"
+    with pytest.raises(UnknownLayoutError):
+        registry.get("missing")
+
+
+def test_warp_display_area_averages_large_displays():
+    # Rayas de 1 px: al reducir 10x deben promediarse a gris, no producir aliasing
+    image = np.zeros((3610, 2800), dtype=np.uint8)
+    image[:, ::2] = 255
+    contour = np.array([[0, 0], [2799, 0], [2799, 3609], [0, 3609]])
+    warped = ImageProcessorService(detection_max_edge=0).warp_display(image, contour, (280, 361))
+    assert warped.shape == (361, 280)
+    assert abs(float(warped.mean()) - 127.5) < 2
+    assert warped.std() < 5
+
+
+def test_warp_display_upscales_small_displays_to_the_frame():
+    image = np.full((50, 40, 3), 80, dtype=np.uint8)
+    contour = np.array([[0, 0], [39, 0], [39, 49], [0, 49]])
+    warped = ImageProcessorService(detection_max_edge=0).warp_display(image, contour, (280, 361))
+    assert warped.shape == (361, 280, 3)
+    assert np.all(warped == 80)
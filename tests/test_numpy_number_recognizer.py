@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from app.infrastructure.services.digit_preprocessor import DIGIT_SIZE
+from app.utils.export_numpy_model import PARITY_TOLERANCE, export_model
+
+keras = pytest.importorskip("keras")
+pytest.importorskip("tensorflow")
+
+
+def build_model(seed: int = 10):
+    keras.utils.set_random_seed(seed)
+    layers = keras.layers
+    model = keras.Sequential([
+        keras.Input(shape=(DIGIT_SIZE, DIGIT_SIZE, 1)),
+        layers.Rescaling(1 / 255),
+        layers.Conv2D(8, 3, padding="same", activation="relu"),
+        layers.BatchNormalization(),
+        layers.MaxPooling2D(2),
+        layers.Conv2D(12, 3, strides=2, padding="valid", activation="relu"),
+        layers.BatchNormalization(center=False),
+        layers.Conv2D(16, 3, strides=2, padding="same"),
+        layers.AveragePooling2D(2, strides=1, padding="same"),
+        layers.Dropout(0.5),
+        layers.Flatten(),
+        layers.Dense(32, activation="relu"),
+        layers.Dropout(0.25),
+        layers.Dense(10, activation="softmax")
+    ])
+
+    # Estadísticas de BatchNormalization distintas de las iniciales (media 0, varianza 1)
+    rng = np.random.default_rng(seed)
+    for layer in model.layers:
+        if isinstance(layer, layers.BatchNormalization):
+            layer.set_weights([
+                rng.normal(0, 0.5, weight.shape).astype(np.float32) if index < len(layer.get_weights()) - 1
+                else rng.uniform(0.2, 2.0, weight.shape).astype(np.float32)
+                for index, weight in enumerate(layer.get_weights())
+            ])
+    # Salidas bien separadas: con los pesos iniciales la softmax es casi uniforme
+    kernel, bias = model.layers[-1].get_weights()
+    model.layers[-1].set_weights([kernel * 20, bias])
+    return model
+
+
+def test_numpy_forward_matches_keras_predict(tmp_path):
+    from app.infrastructure.services.numpy_number_recognizer import NumpyNumberRecognizer
+
+    model = build_model()
+    keras_path, npz_path = str(tmp_path / "digits.keras"), str(tmp_path / "digits.npz")
+    model.save(keras_path)
+    export_model(keras_path, npz_path)
+
+    # Entradas como las del preprocesado (0 o 120) y valores continuos
+    rng = np.random.default_rng(0)
+    binary = (rng.random((64, DIGIT_SIZE, DIGIT_SIZE, 1)) > 0.5).astype(np.float32) * 120
+    continuous = rng.uniform(0, 255, (64, DIGIT_SIZE, DIGIT_SIZE, 1)).astype(np.float32)
+    batch = np.concatenate([binary, continuous])
+
+    expected = model.predict(batch, verbose=0)
+    actual = NumpyNumberRecognizer(npz_path).forward(batch)
+
+    assert actual.shape == expected.shape == (len(batch), 10)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=PARITY_TOLERANCE)
@@ -0,0 +1,96 @@
+import base64, json
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter, sort_spec
+
+
+def make_documents():
+    # Varias mediciones con el mismo timestamp para comprobar el desempate por _id
+    start = datetime(2024, 3, 1, 8, 0)
+    return [{"_id": ObjectId(), "timestamp": start + timedelta(minutes=minute)} for minute in (0, 0, 0, 5, 10, 10, 20)]
+
+
+def matches(document: dict, query: dict) -> bool:
+    # Evalúa el filtro de keyset_filter: {"$or": [{campo: {op: valor}} | {campo: valor, ...}]}
+    if not query:
+        return True
+
+    def match_clause(clause: dict) -> bool:
+        for field, condition in clause.items():
+            value = document[field]
+            if isinstance(condition, dict):
+                (op, bound), = condition.items()
+                if not (value > bound if op == "$gt" else value < bound):
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    return any(match_clause(clause) for clause in query["$or"])
+
+
+def paginate(documents: list, order: str, limit: int) -> list:
+    # Misma lógica que find_measurements sobre una lista en memoria
+    keys = [key for key, _ in sort_spec(order)]
+    ordered = sorted(documents, key=lambda doc: tuple(doc[key] for key in keys), reverse=order == "desc")
+    pages, cursor = [], None
+    while True:
+        page = [doc for doc in ordered if matches(doc, keyset_filter(cursor, order))][:limit + 1]
+        pages.append(page[:limit])
+        if len(page) <= limit:
+            return pages
+        last = page[limit - 1]
+        cursor = encode_cursor(last["timestamp"], last["_id"])
+
+
+def test_cursor_round_trip():
+    timestamp, document_id = datetime(2024, 3, 1, 8, 30, 15, 123000), ObjectId()
+    cursor = encode_cursor(timestamp, document_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, document_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), ObjectId())[:-4]])
+def test_decode_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor)
+
+
+def test_decode_rejects_invalid_id():
+    payload = json.dumps({"t": "2024-01-01T00:00:00", "id": "nope"}).encode()
+    with pytest.raises(ValueError):
+        decode_cursor(base64.urlsafe_b64encode(payload).decode())
+
+
+def test_first_page_has_no_filter():
+    assert keyset_filter(None) == {}
+    assert keyset_filter("") == {}
+
+
+def test_filter_and_sort_follow_the_order():
+    timestamp, document_id = datetime(2024, 3, 1), ObjectId()
+    cursor = encode_cursor(timestamp, document_id)
+
+    assert keyset_filter(cursor, "asc") == {"$or": [
+        {"timestamp": {"$gt": timestamp}}, {"timestamp": timestamp, "_id": {"$gt": document_id}}
+    ]}
+    assert keyset_filter(cursor, "desc") == {"$or": [
+        {"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "_id": {"$lt": document_id}}
+    ]}
+    assert sort_spec("asc") == [("timestamp", 1), ("_id", 1)]
+    assert sort_spec("desc") == [("timestamp", -1), ("_id", -1)]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 10])
+def test_pages_cover_every_document_once_with_tied_timestamps(order, limit):
+    documents = make_documents()
+    pages = paginate(documents, order, limit)
+
+    returned = [doc["_id"] for page in pages for doc in page]
+    expected = [doc["_id"] for doc in sorted(
+        documents, key=lambda doc: (doc["timestamp"], doc["_id"]), reverse=order == "desc"
+    )]
+    assert returned == expected
+    assert all(len(page) <= limit for page in pages)
@@ -0,0 +1,74 @@
+import asyncio, io, math, re
+from datetime import datetime, timedelta
+import pytest
+from pypdf import PdfReader
+from app.utils.pdf_stream import MeasurementsPdfStream
+
+ROWS_PER_PAGE = MeasurementsPdfStream.ROWS_PER_PAGE
+
+
+def measurements(count: int):
+    start = datetime(2024, 1, 1, 8, 0)
+    for idx in range(count):
+        yield {
+            "timestamp": start + timedelta(hours=idx),
+            "result": {"high_pressure": 100 + idx % 80, "low_pressure": 60 + idx % 40, "pulse": 50 + idx % 60}
+        }
+
+
+def render(count: int) -> bytes:
+    async def source():
+        for measure in measurements(count):
+            yield measure
+
+    async def collect() -> bytes:
+        stream = MeasurementsPdfStream(generated_at=datetime(2024, 6, 1))
+        return b"".join([chunk async for chunk in stream.stream(source())])
+
+    return asyncio.run(collect())
+
+
+def xref_offsets(data: bytes) -> dict:
+    # Tabla xref del final del documento: número de objeto -> posición en bytes
+    start = int(re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data).group(1))
+    assert data[start:start + 4] == b"xref"
+    lines = data[start:].split(b"\n")
+    first, size = map(int, lines[1].split())
+    offsets = {}
+    for number, line in enumerate(lines[2:2 + size], start=first):
+        offset, _, kind = line.split()
+        if kind == b"n":
+            offsets[number] = int(offset)
+    return offsets
+
+
+@pytest.mark.parametrize("count", [0, ROWS_PER_PAGE, ROWS_PER_PAGE + 1, 95])
+def test_streamed_pdf_parses_with_expected_pages(count):
+    data = render(count)
+
+    reader = PdfReader(io.BytesIO(data), strict=True)
+    assert len(reader.pages) == max(1, math.ceil(count / ROWS_PER_PAGE))
+    assert reader.metadata.title == "Informe de Mediciones"
+    assert "Informe de Mediciones" in reader.pages[0].extract_text()
+    if count:
+        last = list(measurements(count))[-1]
+        assert last["timestamp"].strftime("%d-%m-%Y %H:%M") in reader.pages[-1].extract_text()
+
+
+@pytest.mark.parametrize("count", [0, ROWS_PER_PAGE, ROWS_PER_PAGE + 1])
+def test_xref_offsets_point_at_object_headers(count):
+    data = render(count)
+    offsets = xref_offsets(data)
+
+    assert sorted(offsets) == list(range(1, len(offsets) + 1))
+    for number, offset in offsets.items():
+        assert data[offset:].startswith(b"%d 0 obj\n" % number)
+
+
+def test_writer_counts_pages():
+    stream = MeasurementsPdfStream()
+    stream.begin()
+    assert stream.writer.page_count == 0
+    stream.page(list(measurements(3)))
+    stream.page([])
+    assert stream.writer.page_count == 2
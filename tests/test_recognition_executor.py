@@ -0,0 +1,44 @@
+import asyncio, threading
+import pytest
+from app.infrastructure.services.recognition_executor import RecognitionExecutor, RecognitionQueueFullError
+
+
+def test_cancelled_requests_keep_their_slot_until_the_job_finishes():
+    async def scenario():
+        executor = RecognitionExecutor("thread", max_workers=1, max_queue_depth=2)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        running = asyncio.ensure_future(executor.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = asyncio.ensure_future(executor.run(lambda: "never"))
+        await asyncio.sleep(0)
+        assert executor.pending == 2
+
+        # El trabajo en cola no ha empezado: cancelarlo libera su hueco
+        queued.cancel()
+        await asyncio.sleep(0.05)
+        assert executor.pending == 1
+
+        # El que ya corre sigue ocupando el worker aunque se cancele la petición
+        running.cancel()
+        await asyncio.sleep(0.05)
+        assert executor.pending == 1
+        with pytest.raises(RecognitionQueueFullError):
+            await asyncio.gather(executor.run(lambda: 1), executor.run(lambda: 2))
+
+        release.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.pending == 0
+        assert await executor.run(lambda: 42) == 42
+        executor.shutdown()
+
+    asyncio.run(scenario())
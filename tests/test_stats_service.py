@@ -0,0 +1,282 @@
+import asyncio, copy, random, statistics
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.infrastructure.services import stats_service
+from app.infrastructure.services.stats_service import (
+    ALL_PERIOD, DAY_PERIOD, STATS_FIELDS, _field_stats, _stats_update, bucket_keys, bucket_range, get_user_stats,
+    parse_reading, reading_values, record_measurements, remove_measurement_from_stats
+)
+
+
+def apply_update(document: dict, update: dict) -> dict:
+    # Aplica $inc/$min/$max/$set/$unset con notación de puntos como lo haría Mongo en un upsert
+    def path(key):
+        *parents, leaf = key.split(".")
+        target = document
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        return target, leaf
+
+    for key, value in update.get("$inc", {}).items():
+        target, leaf = path(key)
+        target[leaf] = target.get(leaf, 0) + value
+    for key, value in update.get("$min", {}).items():
+        target, leaf = path(key)
+        target[leaf] = min(target.get(leaf, value), value)
+    for key, value in update.get("$max", {}).items():
+        target, leaf = path(key)
+        target[leaf] = max(target.get(leaf, value), value)
+    for key, value in update.get("$set", {}).items():
+        target, leaf = path(key)
+        target[leaf] = copy.deepcopy(value)
+    for key in update.get("$unset", {}):
+        target, leaf = path(key)
+        target.pop(leaf, None)
+    return document
+
+
+def random_result(rng: random.Random) -> dict:
+    return {"high_pressure": rng.randint(90, 180), "low_pressure": rng.randint(50, 110), "pulse": rng.randint(45, 130)}
+
+
+def test_incremental_updates_match_a_full_recompute_after_adds_and_removes():
+    rng = random.Random(18)
+    results = [random_result(rng) for _ in range(200)]
+    bucket = {}
+    for result in results:
+        apply_update(bucket, _stats_update(reading_values(result), 1))
+
+    removed = rng.sample(range(len(results)), 60)
+    for idx in removed:
+        apply_update(bucket, _stats_update(reading_values(results[idx]), -1))
+    kept = [result for idx, result in enumerate(results) if idx not in set(removed)]
+
+    assert bucket["count"] == len(kept)
+    for field, source in STATS_FIELDS.items():
+        values = [result[source] for result in kept]
+        assert bucket[field]["count"] == len(values)
+        assert bucket[field]["sum"] == sum(values)
+        assert bucket[field]["sumsq"] == sum(value * value for value in values)
+        stats = _field_stats(bucket[field])
+        assert stats.mean == pytest.approx(statistics.fmean(values))
+        assert stats.variance == pytest.approx(statistics.pvariance(values))
+        assert stats.std_dev == pytest.approx(statistics.pstdev(values))
+
+
+def test_extremes_are_only_set_when_adding():
+    bucket = {}
+    apply_update(bucket, _stats_update({"systolic": 120}, 1))
+    apply_update(bucket, _stats_update({"systolic": 140}, 1))
+    update = _stats_update({"systolic": 140}, -1)
+    assert "$min" not in update and "$max" not in update
+    assert (bucket["systolic"]["min"], bucket["systolic"]["max"]) == (120, 140)
+
+
+def test_non_numeric_readings_are_skipped():
+    assert parse_reading(120) == 120
+    assert parse_reading("085") == 85
+    assert parse_reading("8?") is None
+    assert parse_reading(True) is None
+    assert reading_values({"high_pressure": 120, "low_pressure": "x", "pulse": "70"}) == {"systolic": 120, "pulse": 70}
+
+    bucket = {}
+    apply_update(bucket, _stats_update(reading_values({"high_pressure": 120, "low_pressure": "x", "pulse": 70}), 1))
+    assert bucket["count"] == 1
+    assert "diastolic" not in bucket
+    assert _field_stats(bucket.get("diastolic")).count == 0
+
+
+def test_measurements_fall_inside_their_buckets():
+    start = datetime(2024, 12, 28, 23, 30)
+    for hours in range(0, 24 * 20, 7):
+        timestamp = start + timedelta(hours=hours)
+        keys = bucket_keys(timestamp)
+        assert keys[0] == (ALL_PERIOD, ALL_PERIOD)
+        assert bucket_range(ALL_PERIOD, ALL_PERIOD) is None
+        for period, key in keys[1:]:
+            low, high = bucket_range(period, key)
+            assert low <= timestamp < high
+
+
+class FakeCursor:
+    def __init__(self, documents: list):
+        self.documents = documents
+
+    def sort(self, key: str, direction: int):
+        self.documents.sort(key=lambda document: document[key], reverse=direction < 0)
+        return self
+
+    def limit(self, limit: int):
+        self.documents = self.documents[:limit]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeUpdateResult:
+    def __init__(self, upserted_id=None):
+        self.upserted_id = upserted_id
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for the few collection methods used by the statistics service
+    """
+
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+
+    @staticmethod
+    def matches(document: dict, query: dict) -> bool:
+        for field, condition in query.items():
+            value = document.get(field)
+            if isinstance(condition, dict):
+                for op, bound in condition.items():
+                    if op == "$in" and value not in bound:
+                        return False
+                    if op == "$gte" and not value >= bound:
+                        return False
+                    if op == "$lt" and not value < bound:
+                        return False
+            elif value != condition:
+                return False
+        return True
+
+    def _find(self, query: dict) -> list:
+        return [document for document in self.documents if self.matches(document, query)]
+
+    def find(self, query: dict, projection=None) -> FakeCursor:
+        return FakeCursor([copy.deepcopy(document) for document in self._find(query)])
+
+    async def find_one(self, query: dict, projection=None):
+        found = self._find(query)
+        return copy.deepcopy(found[0]) if found else None
+
+    def _update(self, query: dict, update: dict, upsert: bool):
+        found = self._find(query)
+        if found:
+            apply_update(found[0], update)
+            return found[0], None
+        if not upsert:
+            return None, None
+        document = {"_id": ObjectId(), **query}
+        apply_update(document, {**update, "$set": {**update.get("$setOnInsert", {}), **update.get("$set", {})}})
+        self.documents.append(document)
+        return document, document["_id"]
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> FakeUpdateResult:
+        return FakeUpdateResult(self._update(query, update, upsert)[1])
+
+    async def find_one_and_update(self, query: dict, update: dict, return_document=ReturnDocument.BEFORE):
+        document, _ = self._update(query, update, False)
+        return copy.deepcopy(document)
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        for operation in operations:
+            self._update(operation._filter, operation._doc, operation._upsert)
+
+    async def delete_one(self, query: dict):
+        found = self._find(query)
+        if found:
+            self.documents.remove(found[0])
+
+    async def delete_many(self, query: dict):
+        self.documents = [document for document in self.documents if not self.matches(document, query)]
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    results, stats = FakeCollection(), FakeCollection()
+    monkeypatch.setattr(stats_service, "results_collection", results)
+    monkeypatch.setattr(stats_service, "stats_collection", stats)
+    return results, stats
+
+
+def store(results: FakeCollection, user_id: ObjectId, result: dict, timestamp: datetime) -> dict:
+    document = {"_id": ObjectId(), "user_id": user_id, "result": result, "timestamp": timestamp}
+    results.documents.append(document)
+    return document
+
+
+def assert_matches_measurements(overall, documents: list):
+    assert overall.count == len(documents)
+    for field, source in STATS_FIELDS.items():
+        values = [document["result"][source] for document in documents]
+        stats = getattr(overall, field)
+        assert stats.count == len(values)
+        assert stats.mean == pytest.approx(statistics.fmean(values))
+        assert (stats.min, stats.max) == (min(values), max(values))
+
+
+def test_legacy_history_is_counted_when_the_first_write_comes_before_any_read(collections):
+    results, stats = collections
+    rng = random.Random(7)
+    user_id = ObjectId()
+    start = datetime(2024, 1, 1, 9, 0)
+    # Mediciones guardadas antes de las estadísticas incrementales
+    legacy = [store(results, user_id, random_result(rng), start + timedelta(days=day)) for day in range(10)]
+
+    async def scenario():
+        new = store(results, user_id, random_result(rng), start + timedelta(days=30))
+        await record_measurements(user_id, [(new["result"], new["timestamp"])])
+        assert_matches_measurements(await get_user_stats(user_id), results.documents)
+
+        # Ya inicializadas: las siguientes escrituras solo aplican $inc
+        newer = store(results, user_id, random_result(rng), start + timedelta(days=31))
+        await record_measurements(user_id, [(newer["result"], newer["timestamp"])])
+        results.documents.remove(legacy[3])
+        await remove_measurement_from_stats(user_id, legacy[3])
+
+        assert_matches_measurements(await get_user_stats(user_id, days=100), results.documents)
+        daily = (await get_user_stats(user_id, days=100)).daily
+        assert sorted(bucket.key for bucket in daily) == sorted(
+            document["timestamp"].strftime("%Y-%m-%d") for document in results.documents
+        )
+
+    asyncio.run(scenario())
+
+
+def test_legacy_history_is_counted_when_the_first_write_is_a_delete(collections):
+    results, _ = collections
+    rng = random.Random(8)
+    user_id = ObjectId()
+    legacy = [store(results, user_id, random_result(rng), datetime(2024, 2, day, 8)) for day in range(1, 6)]
+
+    async def scenario():
+        results.documents.remove(legacy[0])
+        await remove_measurement_from_stats(user_id, legacy[0])
+        assert_matches_measurements(await get_user_stats(user_id), results.documents)
+
+    asyncio.run(scenario())
+
+
+def test_failed_rebuild_is_retried(collections, monkeypatch):
+    results, stats = collections
+    user_id = ObjectId()
+    stored = store(results, user_id, {"high_pressure": 120, "low_pressure": 80, "pulse": 70}, datetime(2024, 3, 1))
+    rebuild = stats_service.rebuild_user_stats
+
+    async def failing_rebuild(user_id):
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        monkeypatch.setattr(stats_service, "rebuild_user_stats", failing_rebuild)
+        with pytest.raises(RuntimeError):
+            await record_measurements(user_id, [(stored["result"], stored["timestamp"])])
+        assert stats.documents == []
+
+        monkeypatch.setattr(stats_service, "rebuild_user_stats", rebuild)
+        overall = await get_user_stats(user_id)
+        assert overall.count == 1
+        assert [bucket.key for bucket in overall.daily] == ["2024-03-01"]
+        assert all(document["period"] in (stats_service.REBUILD_PERIOD, ALL_PERIOD, DAY_PERIOD, "week")
+                   for document in stats.documents)
+
+    asyncio.run(scenario())